@@ -0,0 +1,122 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Micro-benchmark of the compression profiles. A synthetic log file is
+compressed the way logrotate does it, with each profile's compresscmd and
+compressoptions reading the file on stdin, and the wall time and ratio
+are reported. Profiles whose compressor is not installed are skipped.
+
+    PYTHONPATH=src python bench/bench_compression.py --size-mb 256 \\
+        --threads 4
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer
+
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from logrotate_extension.compression import PROFILES  # noqa: E402
+
+_LEVELS = ("INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR")
+_WORDS = ("request", "handled", "user", "session", "timeout", "queue",
+          "connection", "closed", "opened", "retry", "ms", "status")
+
+
+def write_log(path, size):
+    """
+    Writes size bytes of synthetic, log-like text to path.
+    """
+    rng = random.Random(0)
+    written = 0
+    with open(path, "w") as f:
+        while written < size:
+            line = "2026-01-01 00:%02d:%02d,%03d %-5s [thread-%d] %s\n" % (
+                rng.randint(0, 59), rng.randint(0, 59), rng.randint(0, 999),
+                rng.choice(_LEVELS), rng.randint(1, 32),
+                " ".join(rng.choice(_WORDS) for _ in range(8)))
+            f.write(line)
+            written += len(line)
+
+
+def run(log_path, levels=None, threads=1):
+    """
+    Compresses log_path with every installed profile and returns a list of \
+result dicts.
+    """
+    size = os.path.getsize(log_path)
+    results = []
+    for name in sorted(PROFILES):
+        profile = PROFILES[name]
+        command = which(os.path.basename(profile.compresscmd))
+        if command is None:
+            sys.stderr.write("%-5s skipped: not installed\n" % name)
+            continue
+        level = (levels or {}).get(name)
+        options = profile.options(level, threads).split()
+        with open(log_path, "rb") as source:
+            start = default_timer()
+            process = subprocess.Popen([command] + options, stdin=source,
+                                       stdout=subprocess.PIPE)
+            compressed = 0
+            for chunk in iter(lambda: process.stdout.read(1 << 20), b""):
+                compressed += len(chunk)
+            process.wait()
+            elapsed = default_timer() - start
+        results.append({"profile": name, "options": " ".join(options),
+                        "seconds": elapsed, "ratio": float(compressed) / size,
+                        "mb_per_second": size / elapsed / 1024 ** 2})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compares the compression profiles on a log file.")
+    parser.add_argument("--size-mb", type=int, default=64,
+                        help="size of the synthetic log file")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="compression_threads of the threaded profiles")
+    parser.add_argument("--log", help="compress this file instead")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    log_path = args.log
+    if log_path is None:
+        handle, log_path = tempfile.mkstemp(suffix=".log")
+        os.close(handle)
+        write_log(log_path, args.size_mb * 1024 ** 2)
+    try:
+        results = run(log_path, threads=args.threads)
+    finally:
+        if args.log is None:
+            os.remove(log_path)
+
+    for result in results:
+        print("%(profile)-5s %(options)-10s %(seconds)8.2f s "
+              "%(mb_per_second)8.1f MB/s  ratio %(ratio).3f" % result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Micro-benchmark of LogrotateExtension load time and of the per-call cost of
+define_property_types()/define_item_types(), cached against rebuilt.
+
+Run from the repository root with litp core on the PYTHONPATH:
+
+    PYTHONPATH=src python bench/bench_schema.py
+"""
+import os
+import subprocess
+import sys
+import timeit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+IMPORT_STMT = ("import logrotate_extension.logrotate_extension as m; "
+               "m.LogrotateExtension()")
+
+
+def import_time(repeat=5):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [SRC_DIR] + [p for p in sys.path if p])
+    script = ("import time; t = time.time(); %s; "
+              "print(time.time() - t)" % IMPORT_STMT)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, "-c", script],
+                                      env=env)
+        samples.append(float(out.decode("ascii").strip()))
+    return min(samples)
+
+
+def _per_call(stmt, setup, number):
+    return min(timeit.repeat(stmt, setup, number=number, repeat=3)) / number
+
+
+def main():
+    setup = ("from logrotate_extension.logrotate_extension import "
+             "LogrotateExtension; ext = LogrotateExtension()")
+    number = 200
+
+    load = import_time()
+    first = _per_call(
+        "LogrotateExtension._schema = None; "
+        "ext.define_property_types(); ext.define_item_types()",
+        setup, number)
+    rebuilt = _per_call(
+        "list(ext._build_property_types(ext._build_property_validators())); "
+        "list(ext._build_item_types())",
+        setup, number)
+    cached = _per_call(
+        "ext.define_property_types(); ext.define_item_types()",
+        setup, number * 100)
+
+    print("extension load (import + instantiate): %10.3f ms" % (load * 1e3))
+    print("schema build on first use:             %10.3f us" % (first * 1e6))
+    print("per-call, rebuilding every call:       %10.3f us" % (rebuilt * 1e6))
+    print("per-call, shared schema:               %10.3f us" % (cached * 1e6))
+    print("per-call speed-up:                     %10.1fx" %
+          (rebuilt / cached))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Benchmark suite of the logrotate extension. Every case is timed a few
+times and its best run is recorded as JSON, so that the results of two
+runs can be compared:
+
+    PYTHONPATH=src python bench/run_benchmarks.py --output new.json \\
+        --baseline old.json
+
+Cases can be selected by name prefix with --only, and the run exits with
+status 1 if any case is slower than its baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from timeit import default_timer
+
+import bench_schema
+from synthetic_model import generate_model
+from synthetic_model import generate_paths
+
+from logrotate_extension.dry_run import DirectoryCache
+from logrotate_extension.dry_run import dry_run
+from logrotate_extension.instrumentation import configure_instrumentation
+from logrotate_extension.logrotate_extension import LogrotateExtension
+from logrotate_extension.logrotate_extension import \
+    MailFirstAndMailLastValidator
+from logrotate_extension.logrotate_extension import PathListValidator
+from logrotate_extension.reconcile import LogrotateDirIndex
+from logrotate_extension.renderer import render_rule
+from logrotate_extension import simulator
+
+CASES = []
+
+
+class SkipCase(Exception):
+    """
+    Raised by a case that cannot run in this environment.
+    """
+
+
+def case(name):
+    def register(func):
+        CASES.append((name, func))
+        return func
+    return register
+
+
+def best_of(func, repeat=3):
+    """
+    Calls func repeat times and returns the shortest wall time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        func()
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@case("extension_load")
+def extension_load():
+    return 1, bench_schema.import_time()
+
+
+@case("define_item_types.first_call")
+def define_item_types_first_call():
+    ext = LogrotateExtension()
+
+    def build():
+        LogrotateExtension._schema = None
+        ext.define_item_types()
+    return 1, best_of(build)
+
+
+@case("define_item_types.cached")
+def define_item_types_cached():
+    ext = LogrotateExtension()
+    calls = 10000
+
+    def call():
+        for _ in range(calls):
+            ext.define_item_types()
+    return calls, best_of(call)
+
+
+def _path_list_case(count):
+    def run():
+        validator = PathListValidator()
+        values = generate_paths(count)
+        return count, best_of(lambda: validator.validate_many(values))
+    return run
+
+
+for _count, _label in ((1000, "1k"), (100000, "100k"), (1000000, "1M")):
+    case("path_list_validator.%s_paths" % _label)(_path_list_case(_count))
+
+
+def _mail_case(nodes, rules_per_node, instrumented=False):
+    def run():
+        validator = MailFirstAndMailLastValidator()
+        rules = [properties for _, node_rules in
+                 generate_model(nodes, rules_per_node)
+                 for _, properties in node_rules]
+
+        def validate():
+            for properties in rules:
+                validator.validate(properties)
+        configure_instrumentation(instrumented)
+        try:
+            return len(rules), best_of(validate)
+        finally:
+            configure_instrumentation(False)
+    return run
+
+
+case("mailfirst_maillast_validator.10k_rules")(_mail_case(100, 100))
+case("mailfirst_maillast_validator.100k_rules")(_mail_case(500, 200))
+case("instrumentation.mailfirst_maillast_100k_rules")(
+    _mail_case(500, 200, instrumented=True))
+
+
+@case("simulator.100k_files_365_days")
+def simulator_100k_files():
+    if simulator.numpy is None:
+        raise SkipCase("NumPy is not installed")
+    rules = [properties for _, node_rules in generate_model(100, 1000)
+             for _, properties in node_rules]
+    files = [(properties, 1e5 + (i % 50) * 1e5)
+             for i, properties in enumerate(rules)]
+    return len(files), best_of(lambda: simulator.simulate(files), repeat=1)
+
+
+@case("dry_run.500_rules")
+def dry_run_500_rules():
+    rules = [(properties["name"], properties["path"])
+             for _, properties in generate_model(1, 500)[0][1]]
+    root = tempfile.mkdtemp()
+    try:
+        for _, path in rules:
+            for pattern in path.split(","):
+                directory = os.path.join(root, os.path.dirname(pattern)[1:])
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                for name in ("a.log", "b.log", os.path.basename(pattern)):
+                    if "*" not in name:
+                        with open(os.path.join(directory, name), "w") as f:
+                            f.write("x" * 1024)
+
+        def expand():
+            for _ in dry_run(rules, cache=DirectoryCache(root)):
+                pass
+        return len(rules), best_of(expand)
+    finally:
+        shutil.rmtree(root)
+
+
+def _logrotate_dir_case(warm):
+    def run():
+        rules = [properties for _, properties in
+                 generate_model(1, 500)[0][1]]
+        directory = tempfile.mkdtemp()
+        try:
+            for properties in rules:
+                with open(os.path.join(directory, properties["name"]),
+                          "w") as f:
+                    f.writelines(render_rule(properties))
+            index = LogrotateDirIndex(directory)
+            if warm:
+                index.refresh()
+                return len(rules), best_of(index.refresh)
+            return len(rules), best_of(
+                lambda: LogrotateDirIndex(directory).refresh())
+        finally:
+            shutil.rmtree(directory)
+    return run
+
+
+case("reconcile.refresh_500_files")(_logrotate_dir_case(False))
+case("reconcile.refresh_500_files_unchanged")(_logrotate_dir_case(True))
+
+
+def run(only=None):
+    results = {}
+    for name, func in CASES:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            ops, seconds = func()
+        except SkipCase as e:
+            sys.stderr.write("%-45s skipped: %s\n" % (name, e))
+            continue
+        results[name] = {"ops": ops, "seconds": seconds,
+                         "us_per_op": seconds * 1e6 / ops}
+        sys.stderr.write("%-45s %12.3f us/op\n" %
+                         (name, results[name]["us_per_op"]))
+    return {"meta": {"timestamp": time.time(),
+                     "python": platform.python_version(),
+                     "machine": platform.machine(),
+                     "node": platform.node()},
+            "results": results}
+
+
+def compare(report, baseline, tolerance):
+    """
+    Prints how every case of report compares to the same case of baseline \
+and returns the names of the cases slower by more than tolerance.
+    """
+    regressions = []
+    for name in sorted(report["results"]):
+        if name not in baseline["results"]:
+            continue
+        ratio = (report["results"][name]["us_per_op"] /
+                 baseline["results"][name]["us_per_op"])
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("%-45s %8.2fx%s" % (name, ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Runs the logrotate extension benchmarks.")
+    parser.add_argument("--output", help="file to write the JSON report to")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slow-down against the baseline")
+    parser.add_argument("--only", action="append",
+                        help="run only cases starting with this prefix")
+    args = parser.parse_args(argv)
+
+    report = run(args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Generator of synthetic LITP models made of many nodes, each with a
+logrotate-rule-config holding many logrotate-rule items.
+"""
+import random
+
+_SERVICES = ("httpd", "jboss", "postgres", "mysql", "libvirtd", "puppet",
+             "mcollective", "rabbitmq", "cobbler", "litp", "sshd", "cron")
+_PERIODS = ("day", "week", "month", "year")
+_SIZES = ("100k", "10M", "50M", "1G", "512")
+
+
+def rule_properties(rng, index):
+    """
+    Returns the properties of one synthetic logrotate-rule, drawn from the \
+random.Random rng.
+    """
+    service = rng.choice(_SERVICES)
+    paths = ["/var/log/%s%d/*.log" % (service, index)]
+    for extra in range(rng.randint(0, 3)):
+        paths.append("/var/log/%s%d/%s-%d.log" %
+                     (service, index, rng.choice(_SERVICES), extra))
+    properties = {
+        "name": "%s_%d" % (service, index),
+        "path": ",".join(paths),
+        "rotate": str(rng.randint(1, 50)),
+        "rotate_every": rng.choice(_PERIODS),
+        "compress": rng.choice(("true", "false")),
+        "missingok": "true",
+    }
+    if rng.random() < 0.5:
+        properties["size"] = rng.choice(_SIZES)
+    if rng.random() < 0.3:
+        properties["delaycompress"] = "true"
+    if rng.random() < 0.2:
+        properties["mail"] = "ops@example.com"
+        properties[rng.choice(("mailfirst", "maillast"))] = "true"
+    if rng.random() < 0.2:
+        properties["postrotate"] = "/sbin/service %s reload" % service
+        properties["sharedscripts"] = rng.choice(("true", "false"))
+    if rng.random() < 0.1:
+        properties["create"] = "true"
+        properties["create_mode"] = "0640"
+        properties["create_owner"] = "root"
+    return properties
+
+
+def generate_model(nodes, rules_per_node, seed=0):
+    """
+    Returns a list of (node_vpath, rules) pairs, where rules is a list of \
+(item_vpath, properties) pairs. The same arguments always produce the same \
+model.
+    """
+    rng = random.Random(seed)
+    model = []
+    for n in range(nodes):
+        node = "/deployments/d1/clusters/c1/nodes/n%d" % n
+        rules = []
+        for r in range(rules_per_node):
+            rules.append(("%s/configs/logrotate/rules/r%d" % (node, r),
+                          rule_properties(rng, r)))
+        model.append((node, rules))
+    return model
+
+
+def generate_paths(count, seed=0):
+    """
+    Returns a list of comma-separated path values holding count paths in \
+total.
+    """
+    rng = random.Random(seed)
+    values = []
+    remaining = count
+    while remaining > 0:
+        width = min(remaining, rng.randint(1, 4))
+        values.append(",".join("/var/log/%s/app-%d.log" %
+                               (rng.choice(_SERVICES), remaining - i)
+                               for i in range(width)))
+        remaining -= width
+    return values
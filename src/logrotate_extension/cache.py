@@ -0,0 +1,97 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_VALIDATION_CACHE_SIZE = 100000
+
+MISSING = object()
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping that holds at most maxsize entries and evicts the \
+least recently used one when full. A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the value cached for key, marking it as most recently used, \
+or default if key is not cached.
+        """
+        with self._lock:
+            value = self._entries.pop(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Caches value for key, evicting the least recently used entries \
+beyond maxsize.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.maxsize > 0:
+                self._entries[key] = value
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """
+        Changes maxsize, evicting the least recently used entries beyond it.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every entry and resets the hit and miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns a dict of the hit and miss counters, the number of entries \
+and maxsize.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entries), "maxsize": self.maxsize}
+
+
+validation_cache = LRUCache(DEFAULT_VALIDATION_CACHE_SIZE)
+
+
+def configure_validation_cache(maxsize):
+    """
+    Caps the number of validation results kept by validation_cache; 0 \
+disables the cache.
+    """
+    validation_cache.resize(maxsize)
@@ -0,0 +1,159 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import os
+from collections import namedtuple
+
+
+class CompressionProfile(namedtuple("CompressionProfile",
+                                    ["compresscmd", "uncompresscmd",
+                                     "compressext", "min_level", "max_level",
+                                     "default_level", "thread_option"])):
+    """
+    The commands, extension and valid levels of a compressor. \
+thread_option is the option that sets its thread count, or None for a \
+single-threaded compressor.
+    """
+    __slots__ = ()
+
+    def options(self, level=None, threads=None):
+        """
+        Returns the compressoptions value for level and threads.
+        """
+        options = ["-%d" % (self.default_level if level is None else level)]
+        if threads is not None and self.thread_option is not None:
+            options.append("%s%d" % (self.thread_option, threads))
+        return " ".join(options)
+
+
+PROFILES = {
+    "gzip": CompressionProfile("/bin/gzip", "/bin/gunzip", ".gz",
+                               1, 9, 6, None),
+    "pigz": CompressionProfile("/usr/bin/pigz", "/usr/bin/unpigz", ".gz",
+                               1, 9, 6, "-p "),
+    "zstd": CompressionProfile("/usr/bin/zstd", "/usr/bin/unzstd", ".zst",
+                               1, 19, 3, "-T"),
+    "xz": CompressionProfile("/usr/bin/xz", "/usr/bin/unxz", ".xz",
+                             0, 9, 6, "-T"),
+}
+
+# The extension and uncompress commands that go with each compress
+# command, by command name.
+_COMMANDS = {
+    "gzip": (".gz", ("gunzip", "gzip", "unpigz", "pigz")),
+    "pigz": (".gz", ("unpigz", "pigz", "gunzip", "gzip")),
+    "zstd": (".zst", ("unzstd", "zstd")),
+    "xz": (".xz", ("unxz", "xz")),
+    "bzip2": (".bz2", ("bunzip2", "bzip2")),
+}
+
+
+def _int(properties, name):
+    # Values that are not integers are reported by their property type.
+    try:
+        return int(properties[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def profile_settings(properties):
+    """
+    Returns a dict of the compresscmd, compressext, compressoptions and \
+uncompresscmd values implied by the compression_profile, \
+compression_level and compression_threads properties, or an empty dict if \
+no profile, or an unknown one, is set.
+    """
+    profile = PROFILES.get(properties.get("compression_profile"))
+    if profile is None:
+        return {}
+    return {
+        "compresscmd": profile.compresscmd,
+        "compressext": profile.compressext,
+        "compressoptions": profile.options(
+            _int(properties, "compression_level"),
+            _int(properties, "compression_threads")),
+        "uncompresscmd": profile.uncompresscmd,
+    }
+
+
+def apply_profile(properties):
+    """
+    Returns properties with the compression settings implied by its \
+compression profile filled in.
+    """
+    settings = profile_settings(properties)
+    if not settings:
+        return properties
+    properties = dict(properties)
+    properties.update(settings)
+    return properties
+
+
+def compression_errors(properties):
+    """
+    Returns (property_name, message) pairs for every inconsistency between \
+the compression properties of a logrotate-rule.
+    """
+    errors = []
+    name = properties.get("compression_profile")
+    level = _int(properties, "compression_level")
+    threads = _int(properties, "compression_threads")
+
+    if name is None:
+        for option in ("compression_level", "compression_threads"):
+            if properties.get(option) is not None:
+                errors.append((option, 'The property "%s" requires the '
+                               'property "compression_profile"' % option))
+        return errors + _command_errors(properties)
+
+    profile = PROFILES.get(name)
+    if profile is None:
+        # Reported by the logrotate_compression_profile property type.
+        return errors
+    if level is not None and not \
+            profile.min_level <= level <= profile.max_level:
+        errors.append(("compression_level",
+                       'The compression level of profile "%s" must be '
+                       'between %d and %d' %
+                       (name, profile.min_level, profile.max_level)))
+    if threads is not None and threads > 1 and profile.thread_option is None:
+        errors.append(("compression_threads",
+                       'The compression profile "%s" is single-threaded; '
+                       'use "pigz", "zstd" or "xz" for more threads' % name))
+
+    for field, value in sorted(profile_settings(properties).items()):
+        if properties.get(field) not in (None, value):
+            errors.append((field, 'The property "%s" conflicts with '
+                           'compression profile "%s", which sets it to '
+                           '"%s"' % (field, name, value)))
+    return errors
+
+
+def _command_errors(properties):
+    # Cross-checks hand-written compression settings of known compressors.
+    command = properties.get("compresscmd")
+    if not command or not command.split():
+        return []
+    known = _COMMANDS.get(os.path.basename(command.split()[0]))
+    if known is None:
+        return []
+    extension, uncompress_commands = known
+    errors = []
+    if properties.get("compressext") not in (None, extension):
+        errors.append(("compressext",
+                       'The property "compressext" must be "%s" for '
+                       'compresscmd "%s"' % (extension, command)))
+    uncompress = properties.get("uncompresscmd")
+    if uncompress and uncompress.split() and os.path.basename(
+            uncompress.split()[0]) not in uncompress_commands:
+        errors.append(("uncompresscmd",
+                       'The property "uncompresscmd" "%s" cannot uncompress '
+                       'the output of compresscmd "%s"' %
+                       (uncompress, command)))
+    return errors
@@ -0,0 +1,102 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+from collections import namedtuple
+
+from .path_index import find_overlaps
+from .path_index import split_path_list
+
+
+class ConsolidatedStanza(namedtuple("ConsolidatedStanza",
+                                    ["name", "rules", "properties"])):
+    """
+    A logrotate stanza standing for one or more logrotate-rule items. name \
+is the name of its rule file, rules the names of the rules it replaces and \
+properties the rule properties it is rendered from, with the combined path \
+list.
+    """
+    __slots__ = ()
+
+
+class ConsolidationReport(namedtuple("ConsolidationReport",
+                                     ["stanzas", "stanzas_before",
+                                      "stanzas_after"])):
+    """
+    The stanzas produced by consolidate() and the number of stanzas before \
+and after consolidation. Each stanza is rendered into a rule file of its \
+own, so these are also the numbers of rule files.
+    """
+    __slots__ = ()
+
+    @property
+    def stanzas_saved(self):
+        return self.stanzas_before - self.stanzas_after
+
+
+def option_key(properties):
+    """
+    Returns a hashable key equal for all rules with the same options, that \
+is the same properties other than name and path.
+    """
+    return tuple(sorted((name, value) for name, value in properties.items()
+                        if name not in ("name", "path") and value is not None))
+
+
+def consolidate(rules, index=None):
+    """
+    Groups rules, (name, properties) pairs of the logrotate-rule items of a \
+node, whose options are equal into a single stanza with the combined path \
+list of the group. A rule with a path that overlaps a path of any other \
+rule is never merged, so which rule logrotate applies to a file never \
+changes. index, a LogrotateDirIndex of the directory the rule files are \
+written to, extends this to the files LITP does not manage: a rule with a \
+path that overlaps one of their stanzas is never merged either, as its \
+paths would move to the file of another name and could be read before or \
+after that stanza. Scripts of merged rules run once per stanza when \
+sharedscripts is set. Returns a ConsolidationReport whose stanzas are \
+sorted by name.
+    """
+    rules = sorted(rules, key=lambda rule: rule[0])
+    overlapping = set()
+    for overlap in find_overlaps((name, properties.get("path", ""))
+                                 for name, properties in rules):
+        overlapping.add(overlap.applied_rule)
+        overlapping.add(overlap.other_rule)
+    if index is not None:
+        for name, properties in rules:
+            if any(index.matching(pattern) for pattern in
+                   split_path_list(properties.get("path", ""))):
+                overlapping.add(name)
+
+    stanzas = []
+    groups = {}
+    for name, properties in rules:
+        if name in overlapping:
+            stanzas.append(ConsolidatedStanza(name, (name,),
+                                              dict(properties)))
+            continue
+        key = option_key(properties)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = []
+        group.append((name, properties))
+
+    for group in groups.values():
+        paths = []
+        for _, properties in group:
+            paths.extend(split_path_list(properties.get("path", "")))
+        name = group[0][0]
+        properties = dict(group[0][1])
+        properties["name"] = name
+        properties["path"] = ",".join(paths)
+        stanzas.append(ConsolidatedStanza(
+            name, tuple(rule_name for rule_name, _ in group), properties))
+
+    stanzas.sort(key=lambda stanza: stanza.name)
+    return ConsolidationReport(stanzas, len(rules), len(stanzas))
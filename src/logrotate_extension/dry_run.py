@@ -0,0 +1,169 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Dry run of the path globs of logrotate rules: what each rule's patterns
+match under a filesystem root, as logrotate would expand them there.
+Directory listings are cached, so directories shared by many rules are
+only read once.
+"""
+import heapq
+import os
+import stat
+from collections import namedtuple
+from fnmatch import fnmatchcase
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+from .path_index import is_glob
+from .path_index import split_path_list
+
+
+DEFAULT_LARGEST = 10
+
+
+class RuleExpansion(namedtuple("RuleExpansion",
+                               ["rule", "files", "total_bytes", "largest",
+                                "unmatched"])):
+    """
+    What the path patterns of the rule named rule match: the number of \
+files, their total size in bytes, the largest of them as (path, size) \
+pairs, largest first, and the patterns that match no file.
+    """
+    __slots__ = ()
+
+
+class DirectoryCache(object):
+    """
+    Listings of the directories under root, each read at most once. A \
+listing maps the names in a directory to (is_dir, size) pairs; symbolic \
+links are followed, as glob does, and size is None for anything other than \
+regular files.
+    """
+
+    def __init__(self, root="/"):
+        self.root = root
+        self.scans = 0
+        self._listings = {}
+
+    def listing(self, directory):
+        """
+        Returns the listing of directory, an absolute path below root, or \
+an empty dict if it cannot be read.
+        """
+        entries = self._listings.get(directory)
+        if entries is None:
+            self.scans += 1
+            path = os.path.join(self.root, directory.lstrip("/"))
+            try:
+                entries = dict(_scan(path))
+            except OSError:
+                entries = {}
+            self._listings[directory] = entries
+        return entries
+
+
+def _scan(path):
+    if scandir is None:
+        for name in os.listdir(path):
+            try:
+                st = os.stat(os.path.join(path, name))
+            except OSError:
+                continue
+            yield name, _entry(st)
+        return
+    for entry in scandir(path):
+        try:
+            st = entry.stat()
+        except OSError:
+            # A dangling symbolic link.
+            continue
+        yield entry.name, _entry(st)
+
+
+def _entry(st):
+    if stat.S_ISDIR(st.st_mode):
+        return True, None
+    return False, st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+def _segment_matches(segment, name):
+    # As with glob(3), wildcards do not match a leading dot.
+    if name.startswith(".") and not segment.startswith("."):
+        return False
+    return fnmatchcase(name, segment)
+
+
+def expand(pattern, cache):
+    """
+    Yields the (path, size) pairs of the regular files matched by the \
+absolute path pattern under the root of the DirectoryCache cache.
+    """
+    segments = [s for s in pattern.replace("\\ ", " ").split("/") if s]
+    if not segments:
+        return
+    directories = ["/"]
+    for depth, segment in enumerate(segments):
+        last = depth == len(segments) - 1
+        matches = []
+        for directory in directories:
+            entries = cache.listing(directory)
+            if is_glob(segment):
+                names = sorted(name for name in entries
+                               if _segment_matches(segment, name))
+            else:
+                names = [segment] if segment in entries else []
+            for name in names:
+                is_dir, size = entries[name]
+                path = directory.rstrip("/") + "/" + name
+                if not last:
+                    if is_dir:
+                        matches.append(path)
+                elif size is not None:
+                    yield path, size
+        directories = matches
+
+
+def expand_rule(name, path, cache, largest=DEFAULT_LARGEST):
+    """
+    Expands path, the comma-separated path property of the rule name, \
+through the DirectoryCache cache and returns its RuleExpansion with the \
+largest largest files. A file matched by several patterns counts once.
+    """
+    sizes = {}
+    unmatched = []
+    for pattern in split_path_list(path):
+        matched = False
+        for file_path, size in expand(pattern, cache):
+            matched = True
+            sizes[file_path] = size
+        if not matched:
+            unmatched.append(pattern)
+    top = heapq.nlargest(largest, sizes.items(),
+                         key=lambda item: (item[1], item[0]))
+    return RuleExpansion(name, len(sizes), sum(sizes.values()), top,
+                         unmatched)
+
+
+def dry_run(rules, root="/", largest=DEFAULT_LARGEST, cache=None):
+    """
+    Yields the RuleExpansion of every rule of rules, (name, path) pairs, \
+as it is expanded under root. Rules share cache, a DirectoryCache of root \
+created if None, so each directory is read once for all of them.
+    """
+    if cache is None:
+        cache = DirectoryCache(root)
+    for name, path in rules:
+        yield expand_rule(name, path, cache, largest)
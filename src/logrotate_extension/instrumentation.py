@@ -0,0 +1,178 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import atexit
+import functools
+import json
+import math
+import random
+import threading
+from timeit import default_timer
+
+
+DEFAULT_MAX_SAMPLES = 10000
+
+PERCENTILES = (50, 90, 99)
+
+
+class _Timing(object):
+    # The counters of one instrumented call site.
+
+    __slots__ = ("calls", "failures", "total", "maximum", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.samples = []
+
+
+def _percentile(ordered, percent):
+    # The nearest-rank percentile of the sorted list ordered.
+    rank = int(math.ceil(percent / 100.0 * len(ordered))) - 1
+    return ordered[max(rank, 0)]
+
+
+class ValidatorStats(object):
+    """
+    Thread-safe call counts, failure counts and latencies of instrumented \
+validation call sites, by name. Latency percentiles are computed from a \
+uniform sample of at most max_samples calls per name. Nothing is \
+recorded while enabled is False.
+    """
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._random = random.Random(0)
+        self.max_samples = max_samples
+        self.enabled = False
+
+    def record(self, name, seconds, failed):
+        """
+        Records one call of name that took seconds and, if failed is true, \
+found the value invalid.
+        """
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = timing = _Timing()
+            timing.calls += 1
+            timing.failures += 1 if failed else 0
+            timing.total += seconds
+            timing.maximum = max(timing.maximum, seconds)
+            if len(timing.samples) < self.max_samples:
+                timing.samples.append(seconds)
+            else:
+                slot = self._random.randrange(timing.calls)
+                if slot < self.max_samples:
+                    timing.samples[slot] = seconds
+
+    def timed(self, name, failed, func, *args):
+        """
+        Calls func with args and records the call under name. The call \
+counts as a failure if it raises or if failed returns true for its result.
+        """
+        start = default_timer()
+        try:
+            result = func(*args)
+        except Exception:
+            self.record(name, default_timer() - start, True)
+            raise
+        self.record(name, default_timer() - start, failed(result))
+        return result
+
+    def reset(self):
+        """
+        Drops everything recorded so far.
+        """
+        with self._lock:
+            self._timings.clear()
+
+    def stats(self):
+        """
+        Returns a dict mapping every recorded name to a dict of its calls, \
+failures, total_seconds, mean_seconds, max_seconds and p50_seconds, \
+p90_seconds and p99_seconds latency percentiles.
+        """
+        with self._lock:
+            timings = [(name, timing.calls, timing.failures, timing.total,
+                        timing.maximum, sorted(timing.samples))
+                       for name, timing in self._timings.items()]
+        stats = {}
+        for name, calls, failures, total, maximum, ordered in timings:
+            entry = {"calls": calls, "failures": failures,
+                     "total_seconds": total, "mean_seconds": total / calls,
+                     "max_seconds": maximum}
+            for percent in PERCENTILES:
+                entry["p%d_seconds" % percent] = _percentile(ordered, percent)
+            stats[name] = entry
+        return stats
+
+    def dump(self, path):
+        """
+        Writes stats() to the file path as JSON.
+        """
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2, sort_keys=True)
+
+
+validator_stats = ValidatorStats()
+
+# The instrumented call sites, as (owner, attribute, original, wrapper).
+_sites = []
+
+_dump_paths = []
+
+
+def _dump_at_exit():
+    for path in _dump_paths:
+        validator_stats.dump(path)
+
+
+def configure_instrumentation(enabled, dump_path=None):
+    """
+    Turns the recording of validator_stats on or off. If dump_path is \
+given, the stats are written to that file as JSON when the process exits.
+    """
+    validator_stats.enabled = enabled
+    for owner, attribute, original, wrapper in _sites:
+        setattr(owner, attribute, wrapper if enabled else original)
+    if dump_path is not None and dump_path not in _dump_paths:
+        if not _dump_paths:
+            atexit.register(_dump_at_exit)
+        _dump_paths.append(dump_path)
+
+
+def is_error(result):
+    """
+    Returns whether result, the return value of a litp validator, reports \
+an error; validators return None or an empty list for valid values.
+    """
+    return not (result is None or isinstance(result, list) and not result)
+
+
+def instrument(owner, attribute, name=None, failed=is_error):
+    """
+    Registers the function attribute of owner, a class or module, as a \
+call site whose calls are recorded in validator_stats, under name or \
+"<owner>.<attribute>", while recording is enabled. The recording wrapper \
+is only installed while recording is enabled, so the call site costs \
+nothing otherwise.
+    """
+    original = owner.__dict__[attribute]
+    name = name or "%s.%s" % (owner.__name__, attribute)
+
+    @functools.wraps(original)
+    def wrapper(*args):
+        return validator_stats.timed(name, failed, original, *args)
+    _sites.append((owner, attribute, original, wrapper))
+    if validator_stats.enabled:
+        setattr(owner, attribute, wrapper)
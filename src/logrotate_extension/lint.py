@@ -0,0 +1,199 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import math
+from collections import namedtuple
+
+from .path_index import is_glob
+from .path_index import split_path_list
+from .units import PERIOD_HOURS
+from .units import size_to_bytes
+
+
+LOW = "low"
+MEDIUM = "medium"
+HIGH = "high"
+
+_SEVERITIES = (LOW, MEDIUM, HIGH)
+
+# The assumptions the cost estimates are based on.
+DISK_BYTES_PER_SECOND = 100.0 * 1024 ** 2
+COMPRESS_BYTES_PER_SECOND = 20.0 * 1024 ** 2
+SCRIPT_SECONDS = 0.05
+FILES_PER_GLOB = 10
+BYTES_PER_DAY = 10.0 * 1024 ** 2
+
+# Findings costing this many seconds of rotation work a day or more are
+# raised to medium and high severity respectively.
+MEDIUM_COST = 1.0
+HIGH_COST = 60.0
+
+# size is considered far below the growth of a file once a single
+# logrotate run finds this many times size written since the last one.
+SIZE_OVERRUN_FACTOR = 10
+
+
+class Finding(namedtuple("Finding", ["rule", "check", "severity",
+                                     "estimated_cost", "message"])):
+    """
+    A costly setting found in a logrotate-rule. estimated_cost is the extra \
+rotation work it causes, in seconds a day.
+    """
+    __slots__ = ()
+
+
+class RuleProfile(namedtuple("RuleProfile", ["files", "bytes_per_day"])):
+    """
+    The expected load of a logrotate-rule: how many log files its paths \
+match and how many bytes a day are written to each of them.
+    """
+    __slots__ = ()
+
+
+def _severity(minimum, cost):
+    if cost >= HIGH_COST:
+        by_cost = HIGH
+    elif cost >= MEDIUM_COST:
+        by_cost = MEDIUM
+    else:
+        by_cost = LOW
+    return max(minimum, by_cost, key=_SEVERITIES.index)
+
+
+def _profile(properties, profile):
+    if profile is not None:
+        return profile
+    files = sum(FILES_PER_GLOB if is_glob(pattern) else 1 for pattern in
+                split_path_list(properties.get("path", "")))
+    return RuleProfile(files, BYTES_PER_DAY)
+
+
+def _runs(properties):
+    # logrotate runs once a day, or once an hour from their own cron entry
+    # for hourly rules.
+    return 24 if properties.get("rotate_every") == "hour" else 1
+
+
+def _size(properties, name):
+    # Returns the size property name in bytes, or None if it is not set or
+    # not valid.
+    value = properties.get(name)
+    if value is None:
+        return None
+    try:
+        return size_to_bytes(value)
+    except ValueError:
+        # Reported by the logrotate_basic_size property type.
+        return None
+
+
+def _rotation(properties, profile):
+    # Returns the number of rotations a day of each file and the bytes a
+    # file holds when it is rotated. size supersedes the period, while
+    # maxsize only rotates a file that reaches it before its period is up.
+    period = PERIOD_HOURS.get(properties.get("rotate_every"), 7 * 24) / 24.0
+    limit = _size(properties, "size")
+    if limit is None:
+        limit = _size(properties, "maxsize")
+        if limit is not None and profile.bytes_per_day * period <= limit:
+            limit = None
+    if limit is None:
+        return 1.0 / period, float(profile.bytes_per_day * period)
+    runs = _runs(properties)
+    written = float(profile.bytes_per_day) / runs
+    if not written:
+        return 0.0, 0.0
+    # The first run that finds a file at limit or above rotates it.
+    every = max(math.ceil(limit / written), 1)
+    return runs / every, written * every
+
+
+def _true(properties, name):
+    return properties.get(name) == "true"
+
+
+def lint_rule(name, properties, profile=None):
+    """
+    Returns the Findings for the logrotate-rule name with properties. \
+profile is its RuleProfile; without one, FILES_PER_GLOB files are assumed \
+per glob pattern and BYTES_PER_DAY bytes a day per file.
+    """
+    profile = _profile(properties, profile)
+    rotations, rotated_bytes = _rotation(properties, profile)
+    files = profile.files
+    findings = []
+
+    scripts = [s for s in ("prerotate", "postrotate")
+               if properties.get(s) is not None]
+    if (scripts and not _true(properties, "sharedscripts") and files > 1 and
+            any(is_glob(p) for p in
+                split_path_list(properties.get("path", "")))):
+        cost = (files - 1) * len(scripts) * rotations * SCRIPT_SECONDS
+        findings.append(Finding(
+            name, "per-file-scripts", _severity(LOW, cost), cost,
+            "%s runs once for each of the ~%d files matched by the wildcard "
+            "paths; set sharedscripts to run it once per rotation" %
+            (" and ".join(scripts), files)))
+
+    if _true(properties, "copy") and _true(properties, "copytruncate"):
+        cost = files * rotations * rotated_bytes / DISK_BYTES_PER_SECOND
+        findings.append(Finding(
+            name, "copy-and-copytruncate", _severity(MEDIUM, cost), cost,
+            "copy and copytruncate are both set; each rotation copies the "
+            "log file and copy stops copytruncate from truncating it"))
+
+    if _true(properties, "shred"):
+        cycles = int(properties.get("shredcycles") or 3)
+        cost = (files * rotations * cycles * rotated_bytes /
+                DISK_BYTES_PER_SECOND)
+        if cost >= MEDIUM_COST:
+            findings.append(Finding(
+                name, "shred-large-files", _severity(LOW, cost), cost,
+                "shred overwrites each expired log file of ~%d bytes %d "
+                "times" % (rotated_bytes, cycles)))
+
+    if (_true(properties, "compress") and
+            not _true(properties, "delaycompress") and
+            not _true(properties, "copytruncate") and
+            properties.get("postrotate") is None):
+        cost = files * rotations * rotated_bytes / COMPRESS_BYTES_PER_SECOND
+        findings.append(Finding(
+            name, "compress-open-file", _severity(LOW, cost), cost,
+            "the rotated file is compressed at once, although nothing makes "
+            "its writer reopen the log; set delaycompress, copytruncate or "
+            "a postrotate command"))
+
+    limit = _size(properties, "size")
+    if limit is not None:
+        runs = _runs(properties)
+        written = float(profile.bytes_per_day) / runs
+        if written >= SIZE_OVERRUN_FACTOR * max(limit, 1):
+            cost = (files * runs * (written - limit) /
+                    COMPRESS_BYTES_PER_SECOND)
+            findings.append(Finding(
+                name, "size-below-growth", _severity(LOW, cost), cost,
+                "size %s is far below the ~%d bytes written to each file "
+                "between logrotate runs, so files are rotated far larger "
+                "than size" % (properties["size"], written)))
+
+    return findings
+
+
+def lint_rules(rules, profiles=None):
+    """
+    Returns the Findings for rules, (name, properties) pairs, ordered by \
+descending estimated cost. profiles maps rule names to their RuleProfile.
+    """
+    profiles = profiles or {}
+    findings = []
+    for name, properties in rules:
+        findings.extend(lint_rule(name, properties, profiles.get(name)))
+    findings.sort(key=lambda finding: (-finding.estimated_cost,
+                                       finding.rule, finding.check))
+    return findings
@@ -8,39 +8,104 @@
 # program(s) have been supplied.
 ##############################################################################
 import re
+import threading
+from collections import namedtuple
 
-from litp.core.model_type import ItemType
-from litp.core.model_type import Collection
-from litp.core.model_type import Property
-from litp.core.model_type import PropertyType
 from litp.core.extension import ModelExtension
 from litp.core.validators import PropertyValidator
 from litp.core.validators import ValidationError
 from litp.core.validators import NotEmptyStringValidator
 from litp.core.validators import ItemValidator
+from litp.core.validators import IntRangeValidator
+
+from .cache import MISSING
+from .cache import validation_cache
+from .compression import compression_errors
+from .instrumentation import instrument
+from .instrumentation import validator_stats
+from .units import size_to_bytes
+
+
+PROPERTY_TYPE_REGEXES = (
+    ("logrotate_basic_size", re.compile(r"^\d+[kMG]?$")),
+    ("logrotate_any_string", re.compile(r"^.+$")),
+    ("logrotate_date_format", re.compile("^([-]?[%]+[Y|m|d|s])*$")),
+    ("logrotate_email", re.compile(r"[^@]+@[^@]+\.[^@]+")),
+    ("logrotate_time_period", re.compile(r"^((hour)|(day)|(week)|"
+                                         "(month)|(year))$")),
+    ("logrotate_stagger_window", re.compile(r"^\d+$")),
+    ("logrotate_stagger_scope", re.compile(r"^((node)|(rule))$")),
+    ("logrotate_compression_profile", re.compile(r"^((gzip)|(pigz)|"
+                                                 "(zstd)|(xz))$")),
+    ("logrotate_compression_level", re.compile(r"^\d{1,2}$")),
+    ("logrotate_compression_threads", re.compile(r"^\d{1,3}$")),
+    ("comma_separated_file_names", re.compile(r"([^,])+(,([^,])+)*")),
+)
+
+_Schema = namedtuple("_Schema",
+                     "property_types item_types regexes validators")
 
 
 class LogrotateExtension(ModelExtension):
     """
     Logrotate model extension. This model extension defines property and item \
 types that enable the user to create logrotate configuration files in the \
-/etc/logrotate.d directory.
+/etc/logrotate.d directory, or in /etc/logrotate.litp for staggered rules.
     """
 
+    _schema = None
+    _schema_lock = threading.Lock()
+
+    @classmethod
+    def get_schema(cls):
+        """
+        Returns the extension's property types, item types, and the \
+compiled regexes and validators of its property types. They are built on \
+first use and then shared, unmodified, by every later caller in the \
+process.
+        """
+        if cls._schema is None:
+            with cls._schema_lock:
+                if cls._schema is None:
+                    validators = cls._build_property_validators()
+                    cls._schema = _Schema(
+                        tuple(cls._build_property_types(validators)),
+                        tuple(cls._build_item_types()),
+                        dict(PROPERTY_TYPE_REGEXES),
+                        validators)
+        return cls._schema
+
     def define_property_types(self):
-        return [PropertyType("logrotate_basic_size", regex=r"^\d+[kMG]?$"),
-                PropertyType("logrotate_any_string", regex=r"^.+$",
-                            validators=[NotEmptyStringValidator()]),
-                PropertyType("logrotate_date_format",
-                             regex="^([-]?[%]+[Y|m|d|s])*$"),
-                PropertyType("logrotate_email", regex=r"[^@]+@[^@]+\.[^@]+"),
-                PropertyType("logrotate_time_period", regex=r"^((day)|(week)|"
-                "(month)|(year))$"),
-                PropertyType("comma_separated_file_names",
-                             regex=r"([^,])+(,([^,])+)*",
-                             validators=[PathListValidator()])]
+        return list(self.get_schema().property_types)
 
     def define_item_types(self):
+        return list(self.get_schema().item_types)
+
+    @staticmethod
+    def _build_property_validators():
+        validators = {
+            "logrotate_any_string": (NotEmptyStringValidator(),),
+            "comma_separated_file_names": (PathListValidator(),),
+            "logrotate_stagger_window": (IntRangeValidator(0, 1440),),
+            "logrotate_compression_threads": (IntRangeValidator(1, 256),),
+        }
+        return dict((type_id, validators.get(type_id, ()))
+                    for type_id, _ in PROPERTY_TYPE_REGEXES)
+
+    @staticmethod
+    def _build_property_types(validators):
+        from litp.core.model_type import PropertyType
+
+        return [PropertyType(type_id, regex=regex.pattern,
+                             validators=list(validators[type_id]))
+                for type_id, regex in PROPERTY_TYPE_REGEXES]
+
+    @staticmethod
+    def _build_item_types():
+        from litp.core.model_type import ItemType
+        from litp.core.model_type import Collection
+        from litp.core.model_type import Property
+
         return [
             ItemType("logrotate-rule-config",
                 extend_item="node-config",
@@ -50,7 +115,9 @@ types that enable the user to create logrotate configuration files in the \
             ItemType("logrotate-rule",
                 item_description="A rule to be configured "
                      "on a node.",
-                     validators=[MailFirstAndMailLastValidator()],
+                     validators=[MailFirstAndMailLastValidator(),
+                                 CompressionProfileValidator(),
+                                 RotationSizeValidator()],
                name=Property("basic_string",
                     prop_description="The name of the rule. "
                                       "The value of this property must be "
@@ -103,6 +170,33 @@ types that enable the user to create logrotate configuration files in the \
                         "specified in compresscmd"
                     )
                 ),
+                compression_profile=Property(
+                    "logrotate_compression_profile",
+                    prop_description=(
+                        "The compressor used for the rotated log files. "
+                        "Valid values are \'gzip\', \'pigz\', "
+                        "\'zstd\' and \'xz\'. The profile sets "
+                        "compresscmd, compressext, compressoptions and "
+                        "uncompresscmd, which must then either be left "
+                        "unset or match it (optional)"
+                    )
+                ),
+                compression_level=Property("logrotate_compression_level",
+                    prop_description=(
+                        "The compression level passed to the compressor "
+                        "of compression_profile: 1 to 9 for gzip and "
+                        "pigz, 1 to 19 for zstd and 0 to 9 for xz "
+                        "(optional)"
+                    )
+                ),
+                compression_threads=Property(
+                    "logrotate_compression_threads",
+                    prop_description=(
+                        "The number of threads the compressor of "
+                        "compression_profile uses. More than one thread "
+                        "requires the pigz, zstd or xz profile (optional)"
+                    )
+                ),
                 copy=Property("basic_boolean",
                     prop_description=(
                         "A copy of the log file is made without changing "
@@ -218,6 +312,15 @@ types that enable the user to create logrotate configuration files in the \
                         "system"
                     )
                 ),
+                maxsize=Property("logrotate_basic_size",
+                    prop_description=(
+                        "The size, measured in bytes, above which a "
+                        "log file is rotated even before the scheduled "
+                        "rotation time. Append k, M or G for "
+                        "kilobytes, megabytes and gigabytes, "
+                        "respectively (optional)"
+                    )
+                ),
                 minsize=Property("logrotate_basic_size",
                     prop_description=(
                         "The minimum size, measured in "
@@ -279,8 +382,11 @@ types that enable the user to create logrotate configuration files in the \
                 rotate_every=Property("logrotate_time_period",
                     prop_description=(
                         "How often the log files should be rotated as "
-                        "a String. Valid values are \'day\', \'week\', "
-                        "\'month\' and \'year\' (optional)"
+                        "a String. Valid values are \'hour\', \'day\', "
+                        "\'week\', \'month\' and \'year\'. The rule "
+                        "file of an hourly rule is written to "
+                        "/etc/logrotate.litp and rotated every hour by "
+                        "an /etc/cron.d entry of its own (optional)"
                     )
                 ),
                 sharedscripts=Property("basic_boolean",
@@ -315,6 +421,29 @@ types that enable the user to create logrotate configuration files in the \
                         "respectively"
                     )
                 ),
+                stagger_scope=Property("logrotate_stagger_scope",
+                    prop_description=(
+                        "Whether the rotation start time is staggered "
+                        "per node, so all the rules of a node rotate "
+                        "together, or per rule. Valid values are "
+                        "\'node\' and \'rule\'; the default is "
+                        "\'rule\' (optional)"
+                    )
+                ),
+                stagger_window=Property("logrotate_stagger_window",
+                    prop_description=(
+                        "The window, in minutes, across which the "
+                        "rotation start time is spread. Each rule gets "
+                        "a fixed offset within the window derived from "
+                        "the node and rule names. The rule file of a "
+                        "staggered rule is written to /etc/logrotate.litp "
+                        "instead of /etc/logrotate.d, so the daily "
+                        "logrotate run does not rotate it, and the rule "
+                        "is rotated by an /etc/cron.d entry of its own, "
+                        "with its own state file. If not set, or set to "
+                        "0, rotation is not staggered (optional)"
+                    )
+                ),
                 start=Property("integer",
                     prop_description=(
                         "The number used as the base for "
@@ -332,31 +461,88 @@ types that enable the user to create logrotate configuration files in the \
         ]
 
 
+def validate_property_value(property_type_id, value):
+    """
+    Validates value against the regex and validators of the extension's \
+property type property_type_id and returns a ValidationError or None. \
+Results are kept in the validation cache, so unchanged values are not \
+validated again.
+    """
+    key = (property_type_id, value)
+    message = validation_cache.get(key)
+    if message is MISSING:
+        message = _property_value_error(property_type_id, value)
+        validation_cache.put(key, message)
+    if message is not None:
+        return ValidationError(error_message=message)
+
+
+def _property_value_error(property_type_id, value):
+    # Only reached on validation cache misses, so instrumentation counts
+    # the regex checks that actually run.
+    schema = LogrotateExtension.get_schema()
+    match = schema.regexes[property_type_id].match
+    if validator_stats.enabled:
+        matched = validator_stats.timed("%s regex" % property_type_id,
+                                        _no_match, match, value)
+    else:
+        matched = match(value)
+    if matched is None:
+        return "Invalid value '%s'." % (value,)
+    for validator in schema.validators[property_type_id]:
+        error = validator.validate(value)
+        if error:
+            return error.error_message
+    return None
+
+
+def _no_match(match):
+    return match is None
+
+
 class PathListValidator(PropertyValidator):
     """
-    Validates that a property value doesn't have quotes \"\
-characters in it.
+    Validates that a property value is a comma-separated list of paths. \
+Each path may only contain letters, digits, the characters -._/#: and the \
+glob characters *?[], and spaces must be escaped as "\\ ".
     """
 
+    # One path is a run of allowed characters and escape sequences; the
+    # alternatives never start with the same character, so the scanner
+    # checks the whole list in a single pass without backtracking.
+    _PATH = r"(?:[A-Za-z0-9_\-.*?\[\]/#:]|\\ ?)+"
+    _PATH_LIST_SCANNER = re.compile(r"%s(?:,%s)*\Z" % (_PATH, _PATH))
+    _PATH_SCANNER = re.compile(r"%s\Z" % _PATH)
+
     def __init__(self,):
         """
         """
         super(PathListValidator, self).__init__()
 
     def validate(self, property_value,):
-        escaped_spaces = property_value.replace(r'\ ', '!')
-        if len(escaped_spaces.split(" ")) > 1:
-            return ValidationError(
-                error_message=("Value \"%s\" is not a valid path." %
-                               (property_value,))
-            )
-        for p in property_value.split(","):
-            if len(p) < 1 or p.startswith(" ") or p.endswith(" "):
-                return ValidationError(
-                    error_message=("Value \"" + p + "\" is not a valid path."))
-            if not re.match(r"([A-Za-z0-9\-\.\*\s\\_\/#:]+)?", p):
-                return ValidationError(
-                    error_message=("Value \"" + p + "\" is not a valid path."))
+        if self._PATH_LIST_SCANNER.match(property_value) is None:
+            return self._error(property_value)
+
+    def validate_many(self, property_values):
+        """
+        Validates every value in property_values and returns a list with, \
+for each value in order, either None or its ValidationError.
+        """
+        match = self._PATH_LIST_SCANNER.match
+        error = self._error
+        return [None if match(value) is not None else error(value)
+                for value in property_values]
+
+    def _error(self, property_value):
+        # Only reached for invalid values, so it is free to take several
+        # passes to find the path to blame.
+        if " " in property_value.replace(r'\ ', ''):
+            invalid = property_value
+        else:
+            invalid = next(p for p in property_value.split(",")
+                           if self._PATH_SCANNER.match(p) is None)
+        return ValidationError(
+            error_message=("Value \"%s\" is not a valid path." % (invalid,)))
 
 
 class MailFirstAndMailLastValidator(ItemValidator):
@@ -380,3 +566,105 @@ class MailFirstAndMailLastValidator(ItemValidator):
             errors = ValidationError(error_message='The properties "mailfirst"'
                         ' and "maillast" can not both be set to true')
         return errors
+
+
+class CompressionProfileValidator(ItemValidator):
+    """
+    Validates that the compression_level and compression_threads properties \
+suit the compression_profile, and that the compresscmd, compressext, \
+compressoptions and uncompresscmd properties agree with the profile, or \
+with each other when no profile is set.
+    """
+
+    def validate(self, properties):
+        errors = compression_errors(properties)
+        if errors:
+            property_name, message = errors[0]
+            return ValidationError(property_name=property_name,
+                                   error_message=message)
+
+
+class RotationSizeValidator(ItemValidator):
+    """
+    Validates that the minsize, size and maxsize properties, compared in \
+bytes, are in ascending order.
+    """
+
+    _ORDER = ("minsize", "size", "maxsize")
+
+    def validate(self, properties):
+        error = self._error([properties.get(name) for name in self._ORDER])
+        if error is not None:
+            property_name, message = error
+            return ValidationError(property_name=property_name,
+                                   error_message=message)
+
+    def _error(self, sizes):
+        ordered = []
+        for name, value in zip(self._ORDER, sizes):
+            if value is None:
+                continue
+            try:
+                ordered.append((name, value, size_to_bytes(value)))
+            except ValueError:
+                # Reported by the logrotate_basic_size property type.
+                continue
+        for i, (name, value, size) in enumerate(ordered):
+            for smaller_name, smaller_value, smaller in ordered[:i]:
+                if smaller > size:
+                    return (name, 'The property "%s" (%s) must not be '
+                            'smaller than the property "%s" (%s)' %
+                            (name, value, smaller_name, smaller_value))
+        return None
+
+
+class RuleUniquenessValidator(object):
+    """
+    Validates that no two logrotate-rule items of a logrotate-rule-config \
+share a name or a path. Duplicates are found through a single index over \
+the rules' names and paths, so the cost grows linearly with the number of \
+rules.
+    """
+
+    def validate(self, rules):
+        """
+        Validates rules, an iterable of (item_path, properties) pairs for \
+the logrotate-rule items of one node, and returns a list of \
+ValidationErrors, one for each rule that conflicts with another.
+        """
+        names = {}
+        paths = {}
+        for item_path, properties in rules:
+            name = properties.get('name')
+            if name is not None:
+                names.setdefault(name, []).append(item_path)
+            for path in set(properties.get('path', '').split(',')):
+                if path:
+                    paths.setdefault(path, []).append(item_path)
+
+        errors = []
+        self._add_errors(errors, names, 'name')
+        self._add_errors(errors, paths, 'path')
+        errors.sort(key=lambda error: (error.item_path,
+                                       error.property_name,
+                                       error.error_message))
+        return errors
+
+    @staticmethod
+    def _add_errors(errors, index, property_name):
+        for value, item_paths in index.items():
+            if len(item_paths) < 2:
+                continue
+            conflicting = ', '.join(sorted(item_paths))
+            for item_path in item_paths:
+                errors.append(ValidationError(
+                    item_path=item_path,
+                    property_name=property_name,
+                    error_message=('The %s "%s" is used by more than one '
+                                   'logrotate-rule: %s' %
+                                   (property_name, value, conflicting))))
+
+
+for _validator in (PathListValidator, MailFirstAndMailLastValidator,
+                   CompressionProfileValidator, RotationSizeValidator):
+    instrument(_validator, "validate")
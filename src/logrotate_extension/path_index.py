@@ -0,0 +1,336 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+from collections import namedtuple
+from fnmatch import fnmatchcase
+
+
+class PathOverlap(namedtuple("PathOverlap",
+                             ["applied_rule", "applied_pattern",
+                              "other_rule", "other_pattern", "shadowed",
+                              "double_rotation"])):
+    """
+    An overlap between the path patterns of two logrotate rules. logrotate \
+applies applied_rule, whose file sorts first in /etc/logrotate.d, to the \
+files matched by both patterns. shadowed is True when every file that \
+other_pattern can match is also matched by applied_pattern, so the other \
+rule never rotates anything through that pattern. double_rotation is True \
+when the files of the two rules are in different directories, read by \
+separate logrotate runs: both rules then rotate the files matched by both \
+patterns, at different times, applied_rule is only the one that sorts \
+first and shadowed is False.
+    """
+    __slots__ = ()
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(segment):
+    """
+    Returns True if a path segment contains glob characters.
+    """
+    return not _GLOB_CHARS.isdisjoint(segment)
+
+
+def split_path_list(path):
+    """
+    Splits a comma-separated path property value into its patterns.
+    """
+    return [p for p in path.split(",") if p]
+
+
+# Tokenized glob segments, by segment. Cleared when it reaches
+# _TOKEN_CACHE_SIZE entries.
+_token_cache = {}
+_TOKEN_CACHE_SIZE = 100000
+
+
+def _tokens(segment):
+    tokens = _token_cache.get(segment)
+    if tokens is None:
+        if len(_token_cache) >= _TOKEN_CACHE_SIZE:
+            _token_cache.clear()
+        tokens = _token_cache[segment] = tuple(_tokenize(segment))
+    return tokens
+
+
+def _tokenize(segment):
+    # Splits a glob segment into "*", "?", literal characters and
+    # (negated, characters) tuples for bracket expressions.
+    tokens = []
+    i = 0
+    length = len(segment)
+    while i < length:
+        c = segment[i]
+        if c == "[":
+            end = segment.find("]", i + 2)
+            if end != -1:
+                body = segment[i + 1:end]
+                negated = body[:1] in ("!", "^")
+                if negated:
+                    body = body[1:]
+                chars = set()
+                j = 0
+                while j < len(body):
+                    if j + 2 < len(body) and body[j + 1] == "-":
+                        chars.update(chr(o) for o in
+                                     range(ord(body[j]), ord(body[j + 2]) + 1))
+                        j += 3
+                    else:
+                        chars.add(body[j])
+                        j += 1
+                tokens.append((negated, frozenset(chars)))
+                i = end + 1
+                continue
+        tokens.append(c)
+        i += 1
+    return tokens
+
+
+def _chars_intersect(a, b):
+    if a == "?" or b == "?":
+        return True
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        # Two negated sets, or a negated and a positive one, share a
+        # character unless the positive set is covered by the negation.
+        if a[0] and b[0]:
+            return True
+        if a[0]:
+            return not b[1] <= a[1]
+        if b[0]:
+            return not a[1] <= b[1]
+        return not a[1].isdisjoint(b[1])
+    if isinstance(a, tuple):
+        return (b in a[1]) != a[0]
+    if isinstance(b, tuple):
+        return (a in b[1]) != b[0]
+    return a == b
+
+
+def segments_intersect(a, b):
+    """
+    Returns True if some path segment is matched by both glob segments a \
+and b.
+    """
+    if not is_glob(a):
+        return fnmatchcase(a, b) if is_glob(b) else a == b
+    if not is_glob(b):
+        return fnmatchcase(b, a)
+    ta = _tokens(a)
+    tb = _tokens(b)
+    la = len(ta)
+    lb = len(tb)
+    memo = {}
+
+    def intersect(i, j):
+        key = (i, j)
+        if key not in memo:
+            if i == la and j == lb:
+                result = True
+            elif i < la and ta[i] == "*":
+                result = (intersect(i + 1, j) or
+                          (j < lb and intersect(i, j + 1)))
+            elif j < lb and tb[j] == "*":
+                result = (intersect(i, j + 1) or
+                          (i < la and intersect(i + 1, j)))
+            elif i < la and j < lb:
+                result = (_chars_intersect(ta[i], tb[j]) and
+                          intersect(i + 1, j + 1))
+            else:
+                result = False
+            memo[key] = result
+        return memo[key]
+
+    return intersect(0, 0)
+
+
+def segment_contains(outer, inner):
+    """
+    Returns True if every path segment matched by the glob segment inner is \
+also matched by outer. Glob-inside-glob containment other than equality \
+and "*" is reported as False.
+    """
+    if outer == inner or outer == "*":
+        return True
+    if is_glob(inner):
+        return False
+    return fnmatchcase(inner, outer)
+
+
+def _literal_prefix(segment):
+    for i, c in enumerate(segment):
+        if c in _GLOB_CHARS:
+            return segment[:i]
+    return segment
+
+
+class _Prefix(object):
+    # A character trie of the child segments of a _Node, each stored under
+    # its literal prefix: the whole segment for a literal one, and the
+    # characters before the first glob character for a glob one.
+    __slots__ = ("children", "literals", "globs")
+
+    def __init__(self):
+        self.children = {}
+        self.literals = []
+        self.globs = []
+
+    def add(self, segment):
+        node = self
+        for c in _literal_prefix(segment):
+            child = node.children.get(c)
+            if child is None:
+                child = node.children[c] = _Prefix()
+            node = child
+        (node.globs if is_glob(segment) else node.literals).append(segment)
+
+    def candidates(self, segment):
+        """
+        Returns the stored literal and glob segments that can intersect \
+segment: the globs whose prefix is a prefix of that of segment and, for a \
+glob segment, every segment whose prefix starts with its prefix.
+        """
+        globs = []
+        node = self
+        for c in _literal_prefix(segment):
+            globs.extend(node.globs)
+            node = node.children.get(c)
+            if node is None:
+                return [], globs
+        if not is_glob(segment):
+            return [], globs + node.globs
+        literals = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            literals.extend(node.literals)
+            globs.extend(node.globs)
+            stack.extend(node.children.values())
+        return literals, globs
+
+
+class _Node(object):
+    __slots__ = ("literals", "globs", "prefixes", "entries")
+
+    def __init__(self):
+        self.literals = {}
+        self.globs = {}
+        self.prefixes = _Prefix()
+        self.entries = []
+
+
+class PathIndex(object):
+    """
+    A trie of logrotate path patterns keyed by path segment. Literal \
+segments are looked up by hash, and glob segments are only compared with \
+the siblings that share their literal prefix, found through a character \
+trie of each node's child segments. Finding the patterns that overlap a \
+new one so costs roughly the number of segments walked and siblings that \
+can overlap, rather than the number of patterns indexed.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def add(self, rule, pattern):
+        """
+        Indexes pattern for rule.
+        """
+        node = self._root
+        for segment in pattern.split("/"):
+            children = node.globs if is_glob(segment) else node.literals
+            child = children.get(segment)
+            if child is None:
+                child = children[segment] = _Node()
+                node.prefixes.add(segment)
+            node = child
+        node.entries.append((rule, pattern))
+
+    def add_rule(self, rule, path):
+        """
+        Indexes every pattern of the comma-separated path value of rule.
+        """
+        for pattern in split_path_list(path):
+            self.add(rule, pattern)
+
+    def matching(self, pattern):
+        """
+        Returns the (rule, pattern) entries whose patterns can match a path \
+that pattern also matches.
+        """
+        frontier = [self._root]
+        for segment in pattern.split("/"):
+            reached = []
+            glob = is_glob(segment)
+            for node in frontier:
+                literals, globs = node.prefixes.candidates(segment)
+                if glob:
+                    reached.extend(node.literals[literal]
+                                   for literal in literals
+                                   if fnmatchcase(literal, segment))
+                else:
+                    child = node.literals.get(segment)
+                    if child is not None:
+                        reached.append(child)
+                reached.extend(node.globs[other] for other in globs
+                               if segments_intersect(segment, other))
+            if not reached:
+                return []
+            frontier = reached
+        return [entry for node in frontier for entry in node.entries]
+
+
+def find_overlaps(rules, directories=None):
+    """
+    Returns a sorted list of PathOverlaps between the patterns of rules, an \
+iterable of (name, path) pairs where path is the rule's comma-separated \
+path value. Rules are ordered by name as logrotate orders their files. \
+directories maps rule names to the directory of their rule file; rules it \
+does not map, or all of them if it is None, share one directory.
+    """
+    directories = directories or {}
+    index = PathIndex()
+    overlaps = set()
+    for name, path in rules:
+        patterns = split_path_list(path)
+        for pattern in patterns:
+            for other_name, other_pattern in index.matching(pattern):
+                if other_name == name:
+                    continue
+                if other_name < name:
+                    overlap = (other_name, other_pattern, name, pattern)
+                else:
+                    overlap = (name, pattern, other_name, other_pattern)
+                overlaps.add(overlap)
+        for pattern in patterns:
+            index.add(name, pattern)
+
+    result = []
+    for applied_rule, applied_pattern, other_rule, other_pattern in overlaps:
+        double = (directories.get(applied_rule) !=
+                  directories.get(other_rule))
+        result.append(PathOverlap(
+            applied_rule, applied_pattern, other_rule, other_pattern,
+            not double and pattern_contains(applied_pattern, other_pattern),
+            double))
+    result.sort()
+    return result
+
+
+def pattern_contains(outer, inner):
+    """
+    Returns True if every path matched by the pattern inner is also \
+matched by the pattern outer, as far as segment_contains can tell.
+    """
+    outer_segments = outer.split("/")
+    inner_segments = inner.split("/")
+    return (len(outer_segments) == len(inner_segments) and
+            all(segment_contains(o, i)
+                for o, i in zip(outer_segments, inner_segments)))
@@ -0,0 +1,278 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Reconciliation of logrotate-rule items with the files already in
+/etc/logrotate.d. The stanzas of the files LITP does not manage are parsed
+and indexed by file name and path pattern, and rules are checked against
+that index for name clashes and overlapping paths.
+"""
+import io
+import os
+import re
+import stat
+import threading
+from collections import namedtuple
+from itertools import chain
+
+from litp.core.validators import ValidationError
+
+from .path_index import PathIndex
+from .path_index import pattern_contains
+from .path_index import split_path_list
+from .renderer import RULE_DIRECTORY
+from .renderer import RULE_FILE_HEADER
+from .renderer import rule_directory
+
+
+DEFAULT_DIRECTORY = "/etc/logrotate.d"
+
+# The file name endings logrotate skips when it reads a directory.
+TABOO_EXTENSIONS = (",v", ".cfsaved", ".disabled", ".dpkg-bak", ".dpkg-del",
+                    ".dpkg-dist", ".dpkg-new", ".dpkg-old", ".rpmnew",
+                    ".rpmorig", ".rpmsave", ".swp", ".ucf-dist", ".ucf-new",
+                    ".ucf-old", "~")
+
+_SCRIPTS = frozenset(("prerotate", "postrotate", "firstaction",
+                      "lastaction", "preremove"))
+
+_WORD = re.compile(r'"([^"]*)"|\'([^\']*)\'|([^\s{}]+)|([{}])')
+
+
+class Stanza(namedtuple("Stanza", ["patterns", "line"])):
+    """
+    A stanza of a logrotate configuration file: its path patterns, with \
+spaces escaped as in the path property, and the number of the line it \
+starts on.
+    """
+    __slots__ = ()
+
+
+class ConfigFile(namedtuple("ConfigFile", ["name", "managed", "stanzas"])):
+    """
+    A file of a logrotate.d directory. managed is True for the rule files \
+written by LITP, whose stanzas are not parsed.
+    """
+    __slots__ = ()
+
+
+def _words(text):
+    for match in _WORD.finditer(text):
+        quoted = match.group(1)
+        if quoted is None:
+            quoted = match.group(2)
+        if quoted is not None:
+            yield quoted.replace(" ", "\\ ")
+        else:
+            yield match.group(3) or match.group(4)
+
+
+def parse_stanzas(lines):
+    """
+    Parses logrotate configuration syntax from lines, an iterable of text \
+lines, and yields its Stanzas one by one. Global directives are skipped, \
+and script bodies are skipped up to their endscript.
+    """
+    patterns = []
+    start = None
+    in_stanza = False
+    in_script = False
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if in_script:
+            if text.split()[:1] == ["endscript"]:
+                in_script = False
+            continue
+        if not text or text.startswith("#"):
+            continue
+        if in_stanza:
+            first = text.split()[0]
+            if first in _SCRIPTS:
+                in_script = True
+            elif first.startswith("}"):
+                in_stanza = False
+                yield Stanza(tuple(patterns), start)
+                patterns = []
+            continue
+
+        if not patterns and text[0] not in "/\"'~{":
+            # A global directive, such as include or weekly.
+            continue
+        for word in _words(text):
+            if word == "{":
+                in_stanza = True
+            elif not in_stanza:
+                if not patterns:
+                    start = number
+                patterns.append(word)
+            elif word == "}":
+                # A stanza closed on the line that opens it.
+                in_stanza = False
+                yield Stanza(tuple(patterns), start)
+                patterns = []
+
+
+def read_config_file(path):
+    """
+    Returns the ConfigFile of the logrotate configuration file path.
+    """
+    with io.open(path, encoding="utf-8", errors="replace") as f:
+        first = f.readline()
+        if first == RULE_FILE_HEADER:
+            return ConfigFile(os.path.basename(path), True, ())
+        stanzas = tuple(parse_stanzas(chain([first], f)))
+    return ConfigFile(os.path.basename(path), False, stanzas)
+
+
+class LogrotateDirIndex(object):
+    """
+    An index of the stanzas of the files in a logrotate.d directory that \
+LITP does not manage, by file name and path pattern. Files are kept with \
+their modification time and size, and refresh() only parses again the \
+files for which either changed.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.parses = 0
+        self._lock = threading.Lock()
+        self._files = {}
+        self._paths = PathIndex()
+
+    def refresh(self):
+        """
+        Brings the index up to date with the directory and returns the \
+names of the files parsed again.
+        """
+        with self._lock:
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                names = []
+            files = {}
+            parsed = []
+            for name in sorted(names):
+                if name.endswith(TABOO_EXTENSIONS):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                key = (st.st_mtime, st.st_size)
+                cached = self._files.get(name)
+                if cached is None or cached[0] != key:
+                    try:
+                        cached = (key, read_config_file(path))
+                    except (IOError, OSError):
+                        continue
+                    self.parses += 1
+                    parsed.append(name)
+                files[name] = cached
+
+            if parsed or set(files) != set(self._files):
+                paths = PathIndex()
+                for _, config in files.values():
+                    for stanza in config.stanzas:
+                        for pattern in stanza.patterns:
+                            paths.add(config.name, pattern)
+                self._paths = paths
+            self._files = files
+            return parsed
+
+    def config_file(self, name):
+        """
+        Returns the ConfigFile name, or None if the directory has no such \
+file.
+        """
+        cached = self._files.get(name)
+        return cached[1] if cached is not None else None
+
+    def unmanaged(self, name):
+        """
+        Returns True if the directory has a file name not managed by LITP.
+        """
+        config = self.config_file(name)
+        return config is not None and not config.managed
+
+    def matching(self, pattern):
+        """
+        Returns the (file_name, pattern) pairs of the unmanaged stanzas whose \
+patterns can match a path that pattern also matches.
+        """
+        return self._paths.matching(pattern)
+
+    def validate(self, rules):
+        """
+        Validates rules, an iterable of (item_path, properties) pairs for \
+the logrotate-rule items of one node, against the indexed files and \
+returns a list of ValidationErrors: one for each rule named like an \
+unmanaged file, and one for each of its paths that an unmanaged stanza \
+also matches. Rules whose files rule_directory() puts outside \
+RULE_DIRECTORY are rotated by a logrotate run of their own, so their \
+overlaps are reported as double rotation.
+        """
+        errors = []
+        for item_path, properties in rules:
+            name = properties.get("name")
+            if name is not None and self.unmanaged(name):
+                errors.append(ValidationError(
+                    item_path=item_path, property_name="name",
+                    error_message=('The name "%s" is used by the file %s, '
+                                   'which is not managed by LITP' %
+                                   (name, os.path.join(self.directory,
+                                                       name)))))
+            separate = rule_directory(properties) != RULE_DIRECTORY
+            for pattern in split_path_list(properties.get("path", "")):
+                for file_name, other in sorted(set(self.matching(pattern))):
+                    errors.append(ValidationError(
+                        item_path=item_path, property_name="path",
+                        error_message=self._overlap_message(
+                            name, pattern, file_name, other, separate)))
+        errors.sort(key=lambda error: (error.item_path,
+                                       error.property_name,
+                                       error.error_message))
+        return errors
+
+    def _overlap_message(self, name, pattern, file_name, other, separate):
+        path = os.path.join(self.directory, file_name)
+        if separate:
+            return ('The path "%s" overlaps "%s" in %s, which is not managed '
+                    'by LITP; the rule is rotated by a logrotate run of its '
+                    'own, so the files matched by both are rotated twice' %
+                    (pattern, other, path))
+        if (name is None or file_name < name) and \
+                pattern_contains(other, pattern):
+            return ('The path "%s" is shadowed by "%s" in %s, which is not '
+                    'managed by LITP and is read first by logrotate' %
+                    (pattern, other, path))
+        first = file_name if name is None else min(file_name, name)
+        return ('The path "%s" overlaps "%s" in %s, which is not managed by '
+                'LITP; logrotate applies the file "%s", which it reads '
+                'first' % (pattern, other, path, first))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def directory_index(directory=DEFAULT_DIRECTORY):
+    """
+    Returns the LogrotateDirIndex of directory, shared by every caller in \
+the process, refreshed so that only files changed since the last call are \
+parsed again.
+    """
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = LogrotateDirIndex(directory)
+    index.refresh()
+    return index
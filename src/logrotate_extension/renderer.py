@@ -0,0 +1,284 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import hashlib
+import os
+
+from .compression import apply_profile
+from .path_index import split_path_list
+
+
+RULE_FILE_HEADER = ("# This file is managed by LITP. "
+                    "Any changes will be overwritten.\n")
+
+RULE_DIRECTORY = "/etc/logrotate.d"
+
+# Staggered and hourly rules are rotated by a cron entry of their own, at
+# their offset or every hour, so their files must stay out of the directory
+# that /etc/logrotate.conf includes for the daily run.
+STAGGERED_RULE_DIRECTORY = "/etc/logrotate.litp"
+
+_INDENT = "    "
+
+_PERIODS = {"hour": "hourly", "day": "daily", "week": "weekly",
+            "month": "monthly", "year": "yearly"}
+
+
+def _flag(on, off):
+    def render(value, properties):
+        return [on if value == "true" else off]
+    return render
+
+
+def _option(directive):
+    def render(value, properties):
+        return ["%s %s" % (directive, value)]
+    return render
+
+
+def _set_only(directive):
+    def render(value, properties):
+        return [directive] if value == "true" else []
+    return render
+
+
+def _script(directive):
+    def render(value, properties):
+        lines = [directive]
+        lines.extend(_INDENT + line for line in value.splitlines())
+        lines.append("endscript")
+        return lines
+    return render
+
+
+def _create(value, properties):
+    if value != "true":
+        return ["nocreate"]
+    words = ["create"]
+    for name in ("create_mode", "create_owner", "create_group"):
+        if properties.get(name) is None:
+            break
+        words.append(properties[name])
+    return [" ".join(words)]
+
+
+def _rotate_every(value, properties):
+    return [_PERIODS[value]]
+
+
+# The directives of a stanza, in the order of the logrotate-rule
+# properties. create_mode, create_owner and create_group are rendered as
+# arguments of create.
+_DIRECTIVES = (
+    ("compress", _flag("compress", "nocompress")),
+    ("compresscmd", _option("compresscmd")),
+    ("compressext", _option("compressext")),
+    ("compressoptions", _option("compressoptions")),
+    ("copy", _flag("copy", "nocopy")),
+    ("copytruncate", _flag("copytruncate", "nocopytruncate")),
+    ("create", _create),
+    ("dateext", _flag("dateext", "nodateext")),
+    ("dateformat", _option("dateformat")),
+    ("delaycompress", _flag("delaycompress", "nodelaycompress")),
+    ("extension", _option("extension")),
+    ("ifempty", _flag("ifempty", "notifempty")),
+    ("mail", _option("mail")),
+    ("mailfirst", _set_only("mailfirst")),
+    ("maillast", _set_only("maillast")),
+    ("maxage", _option("maxage")),
+    ("maxsize", _option("maxsize")),
+    ("minsize", _option("minsize")),
+    ("missingok", _flag("missingok", "nomissingok")),
+    ("olddir", _option("olddir")),
+    ("rotate", _option("rotate")),
+    ("rotate_every", _rotate_every),
+    ("sharedscripts", _flag("sharedscripts", "nosharedscripts")),
+    ("shred", _flag("shred", "noshred")),
+    ("shredcycles", _option("shredcycles")),
+    ("size", _option("size")),
+    ("start", _option("start")),
+    ("uncompresscmd", _option("uncompresscmd")),
+    ("firstaction", _script("firstaction")),
+    ("prerotate", _script("prerotate")),
+    ("postrotate", _script("postrotate")),
+    ("lastaction", _script("lastaction")),
+)
+
+
+def _quote_path(path):
+    if "\\ " in path:
+        return '"%s"' % path.replace("\\ ", " ")
+    return path
+
+
+def rule_directory(properties):
+    """
+    Returns the directory the rule file of the logrotate-rule with \
+properties is written to: STAGGERED_RULE_DIRECTORY if it rotates hourly \
+or its stagger_window is set and not 0, RULE_DIRECTORY otherwise.
+    """
+    if (properties.get("rotate_every") == "hour" or
+            int(properties.get("stagger_window") or 0) > 0):
+        return STAGGERED_RULE_DIRECTORY
+    return RULE_DIRECTORY
+
+
+def render_rule(properties):
+    """
+    Renders the properties of a logrotate-rule item as a logrotate stanza, \
+yielding it line by line. The compression settings of a compression \
+profile are rendered as the directives it implies.
+    """
+    properties = apply_profile(properties)
+    yield "%s {\n" % " ".join(_quote_path(p) for p in
+                              split_path_list(properties["path"]))
+    for name, render in _DIRECTIVES:
+        value = properties.get(name)
+        if value is not None:
+            for line in render(value, properties):
+                yield _INDENT + line + "\n"
+    yield "}\n"
+
+
+def render_rule_file(properties):
+    """
+    Renders the content of the rule file of a logrotate-rule item, yielding \
+it line by line.
+    """
+    yield RULE_FILE_HEADER
+    for line in render_rule(properties):
+        yield line
+
+
+def _digest(chunks):
+    sha = hashlib.sha1()
+    for chunk in chunks:
+        sha.update(chunk.encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _managed(path):
+    try:
+        with open(path) as f:
+            return f.readline() == RULE_FILE_HEADER
+    except (IOError, OSError):
+        return False
+
+
+class RuleRenderer(object):
+    """
+    Renders logrotate-rule items into rule files and remembers \
+the content hash of each rule file, so rules whose content has not changed \
+since they were last rendered are neither returned nor written again.
+    """
+
+    def __init__(self):
+        self._digests = {}
+
+    def digest(self, name):
+        """
+        Returns the content hash last recorded for the rule file name, or \
+None.
+        """
+        return self._digests.get(name)
+
+    def forget(self, name):
+        """
+        Drops the recorded content hash of the rule file name.
+        """
+        self._digests.pop(name, None)
+
+    def changed(self, rules):
+        """
+        Yields a (name, content) pair for every (name, properties) pair of \
+rules whose rendered file differs from the one last recorded, and records \
+its new content hash.
+        """
+        for name, properties in rules:
+            chunks = list(render_rule_file(properties))
+            digest = _digest(chunks)
+            if self._digests.get(name) != digest:
+                self._digests[name] = digest
+                yield name, "".join(chunks)
+
+    def write(self, directory, rules):
+        """
+        Writes the rule files of rules, (name, properties) pairs, into \
+directory and returns the names of the files written. A file is only \
+written if its content differs from the recorded one or, for rules not \
+rendered before, from the file already in directory.
+        """
+        rules = list(rules)
+        for name, _ in rules:
+            if name not in self._digests:
+                digest = self._file_digest(os.path.join(directory, name))
+                if digest is not None:
+                    self._digests[name] = digest
+
+        written = []
+        for name, content in self.changed(rules):
+            path = os.path.join(directory, name)
+            # logrotate skips files ending in "~" when it reads the
+            # directory, so a temporary file left behind is never parsed.
+            temp_path = path + "~"
+            try:
+                with open(temp_path, "w") as f:
+                    f.write(content)
+                os.rename(temp_path, path)
+            except BaseException:
+                self.forget(name)
+                _remove(temp_path)
+                raise
+            written.append(name)
+        return written
+
+    def write_rules(self, rules, directory=RULE_DIRECTORY,
+                    staggered_directory=STAGGERED_RULE_DIRECTORY):
+        """
+        Writes the rule files of rules, (name, properties) pairs, into \
+staggered_directory for staggered and hourly rules and into directory for \
+the others, and returns the paths of the files written. A LITP rule file of \
+the same name left in the other directory, by a rule whose stagger_window \
+or rotate_every changed, is removed, so the rule is not rotated by both \
+the daily run and its own cron entry.
+        """
+        groups = {directory: [], staggered_directory: []}
+        for name, properties in rules:
+            if rule_directory(properties) == STAGGERED_RULE_DIRECTORY:
+                target, other = staggered_directory, directory
+            else:
+                target, other = directory, staggered_directory
+            groups[target].append((name, properties))
+            stale = os.path.join(other, name)
+            if _managed(stale):
+                os.remove(stale)
+                self.forget(name)
+
+        written = []
+        for target in (directory, staggered_directory):
+            if groups[target] and not os.path.isdir(target):
+                os.makedirs(target)
+            written.extend(os.path.join(target, name)
+                           for name in self.write(target, groups[target]))
+        return written
+
+    @staticmethod
+    def _file_digest(path):
+        try:
+            with open(path) as f:
+                return _digest(iter(lambda: f.read(65536), ""))
+        except (IOError, OSError):
+            return None
@@ -0,0 +1,190 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import hashlib
+import multiprocessing
+
+from .logrotate_extension import CompressionProfileValidator
+from .logrotate_extension import MailFirstAndMailLastValidator
+from .logrotate_extension import RotationSizeValidator
+from .logrotate_extension import RuleUniquenessValidator
+from .logrotate_extension import validate_property_value
+
+
+# The logrotate-rule properties whose types are defined by this extension.
+# Properties of litp core types are validated by litp core itself.
+RULE_PROPERTY_TYPES = (
+    ("compresscmd", "logrotate_any_string"),
+    ("compression_level", "logrotate_compression_level"),
+    ("compression_profile", "logrotate_compression_profile"),
+    ("compression_threads", "logrotate_compression_threads"),
+    ("dateformat", "logrotate_date_format"),
+    ("firstaction", "logrotate_any_string"),
+    ("lastaction", "logrotate_any_string"),
+    ("mail", "logrotate_email"),
+    ("maxsize", "logrotate_basic_size"),
+    ("minsize", "logrotate_basic_size"),
+    ("path", "comma_separated_file_names"),
+    ("postrotate", "logrotate_any_string"),
+    ("prerotate", "logrotate_any_string"),
+    ("rotate_every", "logrotate_time_period"),
+    ("size", "logrotate_basic_size"),
+    ("stagger_scope", "logrotate_stagger_scope"),
+    ("stagger_window", "logrotate_stagger_window"),
+    ("uncompresscmd", "logrotate_any_string"),
+)
+
+RULE_VALIDATORS = (MailFirstAndMailLastValidator(),
+                   CompressionProfileValidator(),
+                   RotationSizeValidator())
+
+# Below this many rules per worker process, starting the pool costs more
+# than validating the rules serially.
+MIN_RULES_PER_PROCESS = 2000
+
+
+def validate_rule(item_path, properties):
+    """
+    Validates the properties of the logrotate-rule at item_path against \
+their property types and the item validators of logrotate-rule, and \
+returns the list of ValidationErrors found.
+    """
+    errors = []
+    for name, property_type_id in RULE_PROPERTY_TYPES:
+        value = properties.get(name)
+        if value is None:
+            continue
+        error = validate_property_value(property_type_id, value)
+        if error is not None:
+            error.item_path = item_path
+            error.property_name = name
+            errors.append(error)
+    for validator in RULE_VALIDATORS:
+        error = validator.validate(properties)
+        if error:
+            error.item_path = item_path
+            errors.append(error)
+    return errors
+
+
+def _validate_shard(rules):
+    errors = []
+    for item_path, properties in rules:
+        errors.extend(validate_rule(item_path, properties))
+    return errors
+
+
+def validate_rules(rules, processes=None,
+                   min_rules_per_process=MIN_RULES_PER_PROCESS):
+    """
+    Validates rules, a sequence of (item_path, properties) pairs, and \
+returns the list of ValidationErrors found. The rules are sharded across \
+a pool of up to processes worker processes, by default one per CPU, \
+without using more than one process per min_rules_per_process rules; \
+models too small for two processes are validated serially. The errors \
+are always returned in the order serial validation returns them.
+    """
+    rules = list(rules)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(rules) // max(min_rules_per_process, 1))
+    if processes < 2:
+        return _validate_shard(rules)
+
+    size = -(-len(rules) // processes)
+    shards = [rules[i:i + size] for i in range(0, len(rules), size)]
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(_validate_shard, shards)
+    finally:
+        pool.close()
+        pool.join()
+    return [error for shard_errors in results for error in shard_errors]
+
+
+def fingerprint(properties):
+    """
+    Returns a digest of a logrotate-rule item's property set, which changes \
+whenever any property is added, removed or changed.
+    """
+    sha = hashlib.sha1()
+    for name, value in sorted(properties.items()):
+        sha.update(("%s=%s\0" % (name, value)).encode("utf-8"))
+    return sha.hexdigest()
+
+
+class IncrementalValidator(object):
+    """
+    Validates the logrotate-rule items of many nodes, re-validating only \
+the items whose fingerprint changed since they last validated without \
+errors. The uniqueness checks of a node's logrotate-rule-config are only \
+re-run when one of its items is re-validated or the checks failed last \
+time.
+    """
+
+    def __init__(self):
+        self._fingerprints = {}
+        self._valid_nodes = set()
+        self.revalidated = []
+
+    def reset(self):
+        """
+        Forgets every previous validation, so the next one is a full one.
+        """
+        self._fingerprints = {}
+        self._valid_nodes = set()
+
+    def validate(self, nodes, full=False, processes=None):
+        """
+        Validates nodes, a sequence of (node_path, rules) pairs where rules \
+are (item_path, properties) pairs, and returns the list of \
+ValidationErrors found, grouped by node. If full is True every item and \
+node is validated regardless of earlier validations. The item paths of the \
+re-validated items are left in revalidated.
+        """
+        nodes = [(node_path, list(rules)) for node_path, rules in nodes]
+        if full:
+            self.reset()
+
+        fingerprints = {}
+        dirty = []
+        for _, rules in nodes:
+            for item_path, properties in rules:
+                digest = fingerprint(properties)
+                fingerprints[item_path] = digest
+                if self._fingerprints.get(item_path) != digest:
+                    dirty.append((item_path, properties))
+
+        item_errors = {}
+        for error in validate_rules(dirty, processes):
+            item_errors.setdefault(error.item_path, []).append(error)
+        dirty_paths = set(item_path for item_path, _ in dirty)
+
+        errors = []
+        valid_nodes = set()
+        uniqueness = RuleUniquenessValidator()
+        for node_path, rules in nodes:
+            for item_path, _ in rules:
+                errors.extend(item_errors.get(item_path, []))
+            if (node_path in self._valid_nodes and
+                    not any(item_path in dirty_paths
+                            for item_path, _ in rules)):
+                valid_nodes.add(node_path)
+                continue
+            node_errors = uniqueness.validate(rules)
+            errors.extend(node_errors)
+            if not node_errors:
+                valid_nodes.add(node_path)
+
+        self._fingerprints = dict(
+            (item_path, digest) for item_path, digest in fingerprints.items()
+            if item_path not in item_errors)
+        self._valid_nodes = valid_nodes
+        self.revalidated = [item_path for item_path, _ in dirty]
+        return errors
@@ -0,0 +1,91 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+import hashlib
+import os
+
+from .renderer import STAGGERED_RULE_DIRECTORY
+from .renderer import rule_directory
+
+
+DEFAULT_START = (3, 0)
+
+# Each staggered or hourly rule keeps its own logrotate state, apart from
+# the one of the daily run.
+STATE_FILE = "/var/lib/logrotate.litp-%s.status"
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def stagger_offset(node, rule_name, window, scope="rule"):
+    """
+    Returns the offset, in minutes within [0, window), at which the rule \
+rule_name of node starts rotating. The offset is derived from the node \
+name alone when scope is "node", and from the node and rule names when it \
+is "rule", so it only changes when those names or the window change.
+    """
+    if not window:
+        return 0
+    key = node if scope == "node" else "%s/%s" % (node, rule_name)
+    digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % window
+
+
+def rotation_schedule(node, properties, start=DEFAULT_START):
+    """
+    Returns the cron schedule, as "minute hour day-of-month month \
+day-of-week", at which the logrotate-rule with properties on node is \
+rotated. Rotation starts at start, an (hour, minute) pair, plus the \
+rule's stagger offset. Hourly rules rotate every hour at that minute.
+    """
+    window = int(properties.get("stagger_window") or 0)
+    offset = stagger_offset(node, properties.get("name"), window,
+                            properties.get("stagger_scope") or "rule")
+    days, minutes = divmod(start[0] * 60 + start[1] + offset,
+                           _MINUTES_PER_DAY)
+    hour, minute = divmod(minutes, 60)
+
+    period = properties.get("rotate_every") or "day"
+    if period == "hour":
+        return "%d * * * *" % minute
+    if period == "day":
+        fields = ("*", "*", "*")
+    elif period == "week":
+        fields = ("*", "*", str(days % 7))
+    elif period == "month":
+        fields = (str(1 + days), "*", "*")
+    else:
+        fields = (str(1 + days), "1", "*")
+    return "%d %d %s" % (minute, hour, " ".join(fields))
+
+
+def cron_entry(schedule, config_file, state_file=None):
+    """
+    Returns the /etc/cron.d line that runs logrotate on config_file at \
+schedule.
+    """
+    command = "/usr/sbin/logrotate"
+    if state_file:
+        command += " -s %s" % state_file
+    return "%s root %s %s" % (schedule, command, config_file)
+
+
+def rule_cron_entry(node, properties, start=DEFAULT_START):
+    """
+    Returns the /etc/cron.d line that rotates the staggered or hourly \
+logrotate-rule with properties on node, at its rotation_schedule, from its \
+file in STAGGERED_RULE_DIRECTORY and with its own state file. Returns None \
+for the other rules, which the daily logrotate run rotates.
+    """
+    if rule_directory(properties) != STAGGERED_RULE_DIRECTORY:
+        return None
+    name = properties["name"]
+    return cron_entry(rotation_schedule(node, properties, start),
+                      os.path.join(STAGGERED_RULE_DIRECTORY, name),
+                      STATE_FILE % name)
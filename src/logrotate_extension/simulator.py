@@ -0,0 +1,262 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+"""
+Capacity planning for logrotate rules. The disk usage and rotation I/O of
+a node's log files are simulated day by day, and hour by hour for the
+files of hourly rules, vectorized with NumPy over all of the files at once.
+NumPy is only needed by this module.
+"""
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .units import PERIOD_HOURS
+from .units import size_to_bytes
+
+
+# The values of the settings a rule leaves unset, as in the default
+# /etc/logrotate.conf.
+DEFAULTS = {"rotate_every": "week", "rotate": "4"}
+
+DEFAULT_COMPRESSION_RATIO = 0.1
+
+
+class SimulationResult(namedtuple("SimulationResult",
+                                  ["disk_usage", "rotation_io",
+                                   "peak_disk", "peak_disk_day",
+                                   "peak_io", "peak_io_day"])):
+    """
+    The outcome of a simulation: the bytes on disk at the end of each day, \
+the bytes read and written by rotation on each day, and the peaks of both \
+with the day on which they were first reached.
+    """
+    __slots__ = ()
+
+
+class _Files(object):
+    # The settings of every simulated file as arrays, one entry per file.
+
+    def __init__(self, files, defaults):
+        count = len(files)
+        self.hourly = numpy.zeros(count, dtype=bool)
+        self.period = numpy.ones(count, dtype=numpy.int64)
+        self.size = numpy.full(count, numpy.inf)
+        self.maxsize = numpy.full(count, numpy.inf)
+        self.minsize = numpy.zeros(count)
+        self.rotate = numpy.zeros(count, dtype=numpy.int64)
+        self.expiry = numpy.full(count, numpy.inf)
+        self.compress = numpy.zeros(count, dtype=bool)
+        self.delaycompress = numpy.zeros(count, dtype=bool)
+        self.copy = numpy.zeros(count, dtype=bool)
+        self.notifempty = numpy.zeros(count, dtype=bool)
+        self.rate = numpy.zeros(count)
+        recorded_rows = []
+        recorded = []
+
+        for i, (properties, growth) in enumerate(files):
+            settings = dict(defaults)
+            settings.update((k, v) for k, v in properties.items()
+                            if v is not None)
+            hours = PERIOD_HOURS[settings["rotate_every"]]
+            self.hourly[i] = hours < 24
+            self.period[i] = max(hours // 24, 1)
+            if "size" in settings:
+                self.size[i] = size_to_bytes(settings["size"])
+            if "maxsize" in settings:
+                self.maxsize[i] = size_to_bytes(settings["maxsize"])
+            if "minsize" in settings:
+                self.minsize[i] = size_to_bytes(settings["minsize"])
+            self.rotate[i] = int(settings.get("rotate", 0))
+            if "maxage" in settings:
+                # The hours from a rotation to the logrotate run that
+                # removes the rotated file.
+                maxage = int(settings["maxage"])
+                self.expiry[i] = (maxage * 24 + 1 if self.hourly[i] else
+                                  (maxage + 1) * 24)
+            self.compress[i] = settings.get("compress") == "true"
+            self.delaycompress[i] = settings.get("delaycompress") == "true"
+            self.copy[i] = (settings.get("copy") == "true" or
+                            settings.get("copytruncate") == "true")
+            self.notifempty[i] = settings.get("ifempty") == "false"
+            if numpy.ndim(growth) == 0:
+                self.rate[i] = growth
+            else:
+                recorded_rows.append(i)
+                recorded.append(growth)
+
+        # size makes logrotate ignore the rotation period.
+        self.timed = ~numpy.isfinite(self.size)
+        self.recorded_rows = numpy.array(recorded_rows, dtype=numpy.int64)
+        self.recorded = numpy.array(recorded, dtype=float)
+
+
+class _Archive(object):
+    # The rotated files of every simulated file. They live in a ring of
+    # rotate slots per file: the newest one overwrites the oldest, which
+    # is what "rotate N" retention does.
+
+    def __init__(self, spec, compression_ratio):
+        count = len(spec.rotate)
+        slots = max(int(spec.rotate.max()) if count else 0, 1)
+        self.spec = spec
+        self.ratio = compression_ratio
+        self.ring = numpy.maximum(spec.rotate, 1)
+        self.kept = spec.rotate > 0
+        self.sizes = numpy.zeros((count, slots))
+        self.rotated_at = numpy.zeros((count, slots), dtype=numpy.int64)
+        self.head = numpy.zeros(count, dtype=numpy.int64)
+        self.newest = numpy.full(count, -1, dtype=numpy.int64)
+        self.aged = numpy.isfinite(spec.expiry)
+        self.immediate = spec.compress & ~spec.delaycompress
+        self.delayed = spec.compress & spec.delaycompress
+        # Rotated files that maxage removes, keyed by the hour of their
+        # removal.
+        self.expiries = {}
+        self.total = 0.0
+
+    def rotate(self, r, current, hour):
+        """
+        Rotates the current files of rows r at hour and returns the bytes \
+read and written.
+        """
+        if not len(r):
+            return 0.0
+        spec = self.spec
+        ratio = self.ratio
+        size = current[r]
+        io = 2 * size[spec.copy[r]].sum()
+
+        # delaycompress compresses the previous rotation now.
+        d = r[self.delayed[r] & (self.newest[r] >= 0)]
+        if len(d):
+            previous = self.sizes[d, self.newest[d]]
+            io += previous.sum() * (1 + ratio)
+            self.sizes[d, self.newest[d]] = previous * ratio
+            self.total -= previous.sum() * (1 - ratio)
+
+        compressing = self.immediate[r]
+        io += size[compressing].sum() * (1 + ratio)
+        size = numpy.where(compressing, size * ratio, size)
+
+        position = self.head[r] % self.ring[r]
+        size = numpy.where(self.kept[r], size, 0.0)
+        self.total += size.sum() - self.sizes[r, position].sum()
+        self.sizes[r, position] = size
+        self.rotated_at[r, position] = hour
+        a = self.aged[r]
+        if a.any():
+            for expiry in numpy.unique(spec.expiry[r[a]]):
+                e = spec.expiry[r] == expiry
+                self.expiries.setdefault(hour + int(expiry), []).append(
+                    (r[e], position[e], hour))
+        self.newest[r] = numpy.where(self.kept[r], position, -1)
+        self.head[r] += 1
+        current[r] = 0.0
+        return io
+
+    def expire(self, hour):
+        """
+        Removes the rotated files that maxage removes at hour.
+        """
+        for e, position, rotated in self.expiries.pop(hour, ()):
+            # Slots rotated into again since then hold a newer file.
+            live = self.rotated_at[e, position] == rotated
+            e = e[live]
+            position = position[live]
+            self.total -= self.sizes[e, position].sum()
+            self.sizes[e, position] = 0.0
+
+
+def _rotating(spec, rows, selection, current, due):
+    # Returns the rows of selection whose files logrotate rotates now.
+    c = current[selection]
+    rotating = ((c >= spec.size[selection]) |
+                (c >= spec.maxsize[selection]) |
+                (due & spec.timed[selection] &
+                 (c >= spec.minsize[selection])))
+    rotating &= ~spec.notifempty[selection] | (c > 0)
+    return rows[selection][rotating]
+
+
+def simulate(files, days=365, compression_ratio=DEFAULT_COMPRESSION_RATIO,
+             defaults=None):
+    """
+    Simulates logrotate running for days days over files, a sequence of \
+(properties, growth) pairs: the properties of the logrotate-rule that \
+rotates a log file and the bytes written to that file each day, either a \
+constant or a recorded sequence of days values. logrotate runs once a day \
+for the files of daily and longer rules, and once an hour, with the growth \
+of the day spread evenly over its hours, for those of hourly rules; only \
+the latter are stepped hour by hour. Compressed files shrink to \
+compression_ratio of their size. Settings a rule leaves unset are taken \
+from defaults, DEFAULTS if None. Returns a SimulationResult.
+    """
+    if numpy is None:
+        raise ImportError("The logrotate simulator requires NumPy")
+    spec = _Files(files, DEFAULTS if defaults is None else defaults)
+    archive = _Archive(spec, compression_ratio)
+    rows = numpy.arange(len(files))
+    hourly = rows[spec.hourly]
+    # A slice selects every row without copying the arrays.
+    daily = rows[~spec.hourly] if len(hourly) else slice(None)
+    runs = 24 if len(hourly) else 1
+
+    current = numpy.zeros(len(files))
+    disk_usage = numpy.zeros(days)
+    rotation_io = numpy.zeros(days)
+
+    for day in range(days):
+        growth = spec.rate
+        if len(spec.recorded_rows):
+            growth = spec.rate.copy()
+            growth[spec.recorded_rows] += spec.recorded[:, day]
+        io = 0.0
+        for run in range(runs):
+            hour = day * 24 + 24 - runs + run
+            if len(hourly):
+                current[hourly] += growth[hourly] / 24
+                io += archive.rotate(
+                    _rotating(spec, rows, hourly, current, True),
+                    current, hour)
+            if run == runs - 1:
+                current[daily] += growth[daily]
+                due = (day + 1) % spec.period[daily] == 0
+                io += archive.rotate(
+                    _rotating(spec, rows, daily, current, due),
+                    current, hour)
+            archive.expire(hour)
+        disk_usage[day] = current.sum() + archive.total
+        rotation_io[day] = io
+
+    peak_disk_day = int(disk_usage.argmax()) if days else 0
+    peak_io_day = int(rotation_io.argmax()) if days else 0
+    return SimulationResult(disk_usage, rotation_io,
+                            float(disk_usage[peak_disk_day]) if days else 0.0,
+                            peak_disk_day,
+                            float(rotation_io[peak_io_day]) if days else 0.0,
+                            peak_io_day)
+
+
+def simulate_nodes(nodes, days=365, capacity=None, **kwargs):
+    """
+    Simulates every node of nodes, a sequence of (node, files) pairs with \
+files as for simulate(), and returns a list of (node, SimulationResult) \
+pairs. If capacity, in bytes, is given only the nodes whose peak disk use \
+exceeds it are returned.
+    """
+    results = []
+    for node, files in nodes:
+        result = simulate(files, days, **kwargs)
+        if capacity is None or result.peak_disk > capacity:
+            results.append((node, result))
+    return results
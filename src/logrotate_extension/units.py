@@ -0,0 +1,24 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+PERIOD_HOURS = {"hour": 1, "day": 24, "week": 7 * 24, "month": 30 * 24,
+                "year": 365 * 24}
+
+_SIZE_UNITS = {"k": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def size_to_bytes(size):
+    """
+    Returns the number of bytes of a logrotate_basic_size value, such as \
+"512", "100k", "10M" or "1G".
+    """
+    unit = _SIZE_UNITS.get(size[-1:])
+    if unit is None:
+        return int(size)
+    return int(size[:-1]) * unit
@@ -0,0 +1,58 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import unittest
+from logrotate_extension.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_get_and_put(self):
+        cache = LRUCache(2)
+        self.assertEquals(None, cache.get("a", None))
+        cache.put("a", 1)
+        self.assertEquals(1, cache.get("a"))
+        self.assertEquals({"hits": 1, "misses": 1, "size": 1, "maxsize": 2},
+                          cache.stats())
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEquals(1, cache.get("a"))
+        self.assertEquals(None, cache.get("b", None))
+        self.assertEquals(3, cache.get("c"))
+        self.assertEquals(2, len(cache))
+
+    def test_resize_and_disable(self):
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.resize(1)
+        self.assertEquals(1, len(cache))
+        self.assertEquals("c", cache.get("c"))
+        cache.resize(0)
+        cache.put("d", "d")
+        self.assertEquals(0, len(cache))
+
+    def test_clear(self):
+        cache = LRUCache(3)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEquals({"hits": 0, "misses": 0, "size": 0, "maxsize": 3},
+                          cache.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
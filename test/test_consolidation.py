@@ -0,0 +1,89 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from logrotate_extension.consolidation import consolidate
+from logrotate_extension.consolidation import option_key
+from logrotate_extension.reconcile import LogrotateDirIndex
+
+
+def _rule(name, path, **options):
+    properties = {"name": name, "path": path}
+    properties.update(options)
+    return name, properties
+
+
+class TestConsolidation(unittest.TestCase):
+
+    def test_option_key(self):
+        self.assertEquals(option_key({"name": "a", "path": "/a",
+                                      "rotate": "5", "compress": "true"}),
+                          option_key({"compress": "true", "rotate": "5",
+                                      "name": "b", "path": "/b"}))
+        self.assertNotEquals(option_key({"rotate": "5"}),
+                             option_key({"rotate": "6"}))
+
+    def test_equal_options_are_merged(self):
+        report = consolidate([
+            _rule("web", "/var/log/web/*.log", rotate="5"),
+            _rule("app", "/var/log/app/*.log,/var/log/app.out", rotate="5"),
+            _rule("db", "/var/log/db/*.log", rotate="7"),
+            _rule("jobs", "/var/log/jobs/*.log", rotate="5"),
+        ])
+        self.assertEquals(["app", "db"],
+                          [stanza.name for stanza in report.stanzas])
+        app = report.stanzas[0]
+        self.assertEquals(("app", "jobs", "web"), app.rules)
+        self.assertEquals({"name": "app", "rotate": "5",
+                           "path": "/var/log/app/*.log,/var/log/app.out,"
+                                   "/var/log/jobs/*.log,/var/log/web/*.log"},
+                          app.properties)
+        self.assertEquals((4, 2),
+                          (report.stanzas_before, report.stanzas_after))
+        self.assertEquals(2, report.stanzas_saved)
+
+    def test_overlapping_rules_are_not_merged(self):
+        report = consolidate([
+            _rule("a", "/var/log/app/*.log", rotate="5"),
+            _rule("b", "/var/log/app/error.log", rotate="5"),
+            _rule("c", "/var/log/other.log", rotate="7"),
+            _rule("d", "/var/log/other/*.log", rotate="5"),
+            _rule("e", "/var/log/other.log", rotate="5"),
+        ])
+        self.assertEquals([("a",), ("b",), ("c",), ("d",), ("e",)],
+                          [stanza.rules for stanza in report.stanzas])
+        self.assertEquals(0, report.stanzas_saved)
+
+    def test_rules_overlapping_unmanaged_files_are_not_merged(self):
+        directory = tempfile.mkdtemp()
+        try:
+            # Merged into "app", web would be read before "httpd", which
+            # now applies to its files.
+            with open(os.path.join(directory, "httpd"), "w") as f:
+                f.write("/var/log/web/access.log {\n}\n")
+            index = LogrotateDirIndex(directory)
+            index.refresh()
+            report = consolidate([
+                _rule("app", "/var/log/app/*.log", rotate="5"),
+                _rule("web", "/var/log/web/*.log", rotate="5"),
+                _rule("jobs", "/var/log/jobs/*.log", rotate="5"),
+            ], index)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEquals([("app", "jobs"), ("web",)],
+                          [stanza.rules for stanza in report.stanzas])
+
+
+if __name__ == '__main__':
+    unittest.main()
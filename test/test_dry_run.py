@@ -0,0 +1,101 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from logrotate_extension.dry_run import DirectoryCache
+from logrotate_extension.dry_run import RuleExpansion
+from logrotate_extension.dry_run import dry_run
+from logrotate_extension.dry_run import expand
+
+# The fixture tree, as paths relative to the root and file sizes.
+FILES = {
+    "var/log/messages": 500,
+    "var/log/secure": 20,
+    "var/log/.hidden.log": 5,
+    "var/log/httpd/access.log": 300,
+    "var/log/httpd/error.log": 100,
+    "var/log/httpd/old/access.log.1": 50,
+    "var/log/jboss/server.log": 400,
+    "var/log/jboss/gc.log": 10,
+    "var/log/my app/app.log": 7,
+}
+
+
+class TestDryRun(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for path, size in FILES.items():
+            path = os.path.join(self.root, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write("x" * size)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _expand(self, pattern):
+        return sorted(expand(pattern, DirectoryCache(self.root)))
+
+    def test_expand(self):
+        self.assertEquals([("/var/log/messages", 500)],
+                          self._expand("/var/log/messages"))
+        self.assertEquals([("/var/log/httpd/access.log", 300),
+                           ("/var/log/httpd/error.log", 100),
+                           ("/var/log/jboss/gc.log", 10),
+                           ("/var/log/jboss/server.log", 400),
+                           ("/var/log/my app/app.log", 7)],
+                          self._expand("/var/log/*/*.log"))
+        self.assertEquals([("/var/log/httpd/access.log", 300),
+                           ("/var/log/httpd/error.log", 100)],
+                          self._expand("/var/log/httpd/[ae]*.log"))
+        self.assertEquals([("/var/log/my app/app.log", 7)],
+                          self._expand("/var/log/my\\ app/*.log"))
+
+    def test_expand_skips_directories_and_dot_files(self):
+        self.assertEquals([("/var/log/messages", 500),
+                           ("/var/log/secure", 20)],
+                          self._expand("/var/log/*"))
+        self.assertEquals([("/var/log/.hidden.log", 5)],
+                          self._expand("/var/log/.*.log"))
+        self.assertEquals([], self._expand("/var/log/missing/*.log"))
+
+    def test_dry_run(self):
+        results = list(dry_run([
+            ("httpd", "/var/log/httpd/*.log,/var/log/httpd/access.log"),
+            ("system", "/var/log/messages,/var/log/secure,/var/log/cron"),
+        ], self.root, largest=1))
+        self.assertEquals([
+            RuleExpansion("httpd", 2, 400,
+                          [("/var/log/httpd/access.log", 300)], []),
+            RuleExpansion("system", 2, 520, [("/var/log/messages", 500)],
+                          ["/var/log/cron"]),
+        ], results)
+
+    def test_directories_are_scanned_once(self):
+        cache = DirectoryCache(self.root)
+        rules = [("rule%d" % i, "/var/log/*/*.log,/var/log/messages")
+                 for i in range(100)]
+        results = dry_run(rules, cache=cache)
+        self.assertEquals(6, next(results).files)
+        scans = cache.scans
+        self.assertEquals([6] * 99, [r.files for r in results])
+        # /, /var, /var/log and the three directories holding *.log files.
+        self.assertEquals(6, scans)
+        self.assertEquals(scans, cache.scans)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from logrotate_extension.cache import validation_cache
+from logrotate_extension.instrumentation import ValidatorStats
+from logrotate_extension.instrumentation import configure_instrumentation
+from logrotate_extension.instrumentation import instrument
+from logrotate_extension.instrumentation import validator_stats
+from logrotate_extension.logrotate_extension import \
+    MailFirstAndMailLastValidator
+from logrotate_extension.logrotate_extension import validate_property_value
+
+
+class TestValidatorStats(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        validation_cache.clear()
+        validator_stats.reset()
+
+    def tearDown(self):
+        configure_instrumentation(False)
+        validator_stats.reset()
+        shutil.rmtree(self.tmpdir)
+
+    def test_stats(self):
+        stats = ValidatorStats()
+        for i in range(1, 101):
+            stats.record("check", i / 1000.0, i % 10 == 0)
+        entry = stats.stats()["check"]
+        self.assertEquals((100, 10), (entry["calls"], entry["failures"]))
+        self.assertAlmostEquals(5.05, entry["total_seconds"])
+        self.assertAlmostEquals(0.0505, entry["mean_seconds"])
+        self.assertEquals((0.05, 0.09, 0.099, 0.1),
+                          (entry["p50_seconds"], entry["p90_seconds"],
+                           entry["p99_seconds"], entry["max_seconds"]))
+
+    def test_samples_are_bounded(self):
+        stats = ValidatorStats(max_samples=10)
+        for i in range(1000):
+            stats.record("check", 1.0, False)
+        self.assertEquals(10, len(stats._timings["check"].samples))
+        self.assertEquals(1000, stats.stats()["check"]["calls"])
+
+    def test_wrapper_installed_only_while_enabled(self):
+        class Checker(object):
+            def check(self, value):
+                if value is None:
+                    raise ValueError()
+                return value
+
+        original = Checker.__dict__["check"]
+        instrument(Checker, "check")
+        checker = Checker()
+        self.assertTrue(Checker.__dict__["check"] is original)
+        self.assertEquals("x", checker.check("x"))
+        self.assertEquals({}, validator_stats.stats())
+
+        configure_instrumentation(True)
+        checker.check([])
+        checker.check("error")
+        self.assertRaises(ValueError, checker.check, None)
+        entry = validator_stats.stats()["Checker.check"]
+        self.assertEquals((3, 2), (entry["calls"], entry["failures"]))
+
+        configure_instrumentation(False)
+        self.assertTrue(Checker.__dict__["check"] is original)
+
+    def test_validators_and_regexes_are_instrumented(self):
+        configure_instrumentation(True)
+        MailFirstAndMailLastValidator().validate({"mailfirst": "true",
+                                                  "maillast": "true"})
+        validate_property_value("logrotate_basic_size", "10M")
+        validate_property_value("logrotate_basic_size", "10T")
+        validate_property_value("comma_separated_file_names", "/var/log/a")
+        stats = validator_stats.stats()
+        self.assertEquals(["MailFirstAndMailLastValidator.validate",
+                           "PathListValidator.validate",
+                           "comma_separated_file_names regex",
+                           "logrotate_basic_size regex"], sorted(stats))
+        self.assertEquals(1, stats["MailFirstAndMailLastValidator.validate"]
+                          ["failures"])
+        self.assertEquals((2, 1), (stats["logrotate_basic_size regex"]
+                                   ["calls"],
+                                   stats["logrotate_basic_size regex"]
+                                   ["failures"]))
+
+    def test_dump(self):
+        path = os.path.join(self.tmpdir, "stats.json")
+        validator_stats.record("check", 0.5, False)
+        validator_stats.dump(path)
+        with open(path) as f:
+            self.assertEquals(1, json.load(f)["check"]["calls"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import time
+import unittest
+from logrotate_extension.lint import HIGH
+from logrotate_extension.lint import LOW
+from logrotate_extension.lint import MEDIUM
+from logrotate_extension.lint import RuleProfile
+from logrotate_extension.lint import lint_rule
+from logrotate_extension.lint import lint_rules
+
+GB = 1024 ** 3
+
+
+def _checks(findings):
+    return [(f.check, f.severity) for f in findings]
+
+
+class TestLint(unittest.TestCase):
+
+    def test_clean_rule(self):
+        self.assertEquals([], lint_rule("app", {
+            "path": "/var/log/app/*.log", "compress": "true",
+            "delaycompress": "true", "postrotate": "/bin/true",
+            "sharedscripts": "true"}))
+
+    def test_per_file_scripts(self):
+        findings = lint_rule("app", {"path": "/var/log/app/*.log",
+                                     "rotate_every": "day",
+                                     "postrotate": "/bin/true"},
+                             RuleProfile(101, 1024))
+        self.assertEquals([("per-file-scripts", MEDIUM)], _checks(findings))
+        self.assertAlmostEquals(5.0, findings[0].estimated_cost)
+        self.assertEquals([], lint_rule("app", {"path": "/var/log/app.log",
+                                                "postrotate": "/bin/true"}))
+
+    def test_size_supersedes_the_period(self):
+        # A file growing 1k a day reaches size 4k every 4 days, daily
+        # rule or not, and 2k every other day, well before its week is up.
+        for rule, cost in (({"rotate_every": "day", "size": "4k"}, 1.25),
+                           ({"size": "2k"}, 2.5),
+                           ({"maxsize": "2k"}, 2.5),
+                           ({"rotate_every": "day", "maxsize": "2k"}, 5.0)):
+            rule.update({"path": "/var/log/app/*.log",
+                         "postrotate": "/bin/true"})
+            findings = lint_rule("app", rule, RuleProfile(101, 1024))
+            self.assertAlmostEquals(cost, findings[0].estimated_cost)
+
+    def test_copy_and_copytruncate(self):
+        self.assertEquals([("copy-and-copytruncate", MEDIUM)],
+                          _checks(lint_rule("app", {
+                              "path": "/var/log/app.log", "copy": "true",
+                              "copytruncate": "true"})))
+
+    def test_shred_large_files(self):
+        findings = lint_rule("app", {"path": "/var/log/app.log",
+                                     "rotate_every": "day", "shred": "true",
+                                     "shredcycles": "10"},
+                             RuleProfile(1, GB))
+        self.assertEquals([("shred-large-files", HIGH)], _checks(findings))
+        self.assertAlmostEquals(102.4, findings[0].estimated_cost)
+        self.assertEquals([], lint_rule("app", {
+            "path": "/var/log/app.log", "rotate_every": "day",
+            "shred": "true"}, RuleProfile(1, 1024)))
+
+    def test_compress_open_file(self):
+        self.assertEquals([("compress-open-file", LOW)],
+                          _checks(lint_rule("app", {
+                              "path": "/var/log/app.log",
+                              "rotate_every": "day", "compress": "true"})))
+
+    def test_size_below_growth(self):
+        findings = lint_rule("app", {"path": "/var/log/app.log",
+                                     "size": "1M"}, RuleProfile(1, GB))
+        self.assertEquals([("size-below-growth", MEDIUM)], _checks(findings))
+        self.assertEquals([], lint_rule("app", {"path": "/var/log/app.log",
+                                                "size": "1G"},
+                                        RuleProfile(1, GB)))
+        # Hourly rules are checked against the growth of an hour.
+        self.assertEquals([], lint_rule("app", {"path": "/var/log/app.log",
+                                                "size": "100M",
+                                                "rotate_every": "hour"},
+                                        RuleProfile(1, GB)))
+
+    def test_invalid_sizes_are_skipped(self):
+        # They are reported by their property type instead.
+        findings = lint_rules([
+            ("a", {"path": "/var/log/a.log", "size": "10T"}),
+            ("b", {"path": "/var/log/b.log", "maxsize": "big",
+                   "compress": "true"}),
+            ("c", {"path": "/var/log/c.log", "size": "1M"}),
+        ], {"a": RuleProfile(1, GB), "c": RuleProfile(1, GB)})
+        self.assertEquals([("b", "compress-open-file"),
+                           ("c", "size-below-growth")],
+                          sorted((f.rule, f.check) for f in findings))
+
+    def test_lint_rules_is_fast_and_sorted(self):
+        rules = [("rule%d" % i, {"path": "/var/log/app%d/*.log" % i,
+                                 "compress": "true", "copy": "true",
+                                 "copytruncate": "true",
+                                 "postrotate": "/bin/true"})
+                 for i in range(5000)]
+        start = time.time()
+        findings = lint_rules(rules, {"rule7": RuleProfile(10, GB)})
+        self.assertTrue(time.time() - start < 5)
+        self.assertEquals(10000, len(findings))
+        self.assertEquals(("rule7", "copy-and-copytruncate"),
+                          (findings[0].rule, findings[0].check))
+        costs = [f.estimated_cost for f in findings]
+        self.assertEquals(sorted(costs, reverse=True), costs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,9 +9,16 @@
 ##############################################################################
 
 
+import time
 import unittest
 from logrotate_extension.logrotate_extension import LogrotateExtension
 from logrotate_extension.logrotate_extension import MailFirstAndMailLastValidator
+from logrotate_extension.logrotate_extension import PathListValidator
+from logrotate_extension.logrotate_extension import RuleUniquenessValidator
+from logrotate_extension.logrotate_extension import CompressionProfileValidator
+from logrotate_extension.logrotate_extension import RotationSizeValidator
+from logrotate_extension.logrotate_extension import validate_property_value
+from logrotate_extension.cache import validation_cache
 from litp.core.validators import ValidationError
 
 
@@ -19,6 +26,7 @@ class TestsysparamspluginExtension(unittest.TestCase):
 
     def setUp(self):
         self.ext = LogrotateExtension()
+        validation_cache.clear()
 
     def test_property_types_registered(self):
         # Assert that only extension's property types
@@ -27,6 +35,11 @@ class TestsysparamspluginExtension(unittest.TestCase):
                                'logrotate_any_string',
                                'logrotate_date_format',
                                'logrotate_email', 'logrotate_time_period',
+                               'logrotate_stagger_window',
+                               'logrotate_stagger_scope',
+                               'logrotate_compression_profile',
+                               'logrotate_compression_level',
+                               'logrotate_compression_threads',
                                'comma_separated_file_names']
         prop_types = [pt.property_type_id for pt in
                       self.ext.define_property_types()]
@@ -41,6 +54,22 @@ class TestsysparamspluginExtension(unittest.TestCase):
         diff = [x for x in item_types_expected if x not in item_types]
         self.assertEquals(len(diff), 0)
 
+    def test_schema_built_once_and_shared(self):
+        item_types = self.ext.define_item_types()
+        other = LogrotateExtension()
+        self.assertEquals([id(it) for it in item_types],
+                          [id(it) for it in other.define_item_types()])
+        self.assertTrue(self.ext.get_schema() is other.get_schema())
+
+        # The returned lists are copies; mutating them leaves the schema
+        # untouched.
+        property_types = self.ext.define_property_types()
+        count = len(property_types)
+        item_types.pop()
+        property_types.pop()
+        self.assertEquals(2, len(self.ext.define_item_types()))
+        self.assertEquals(count, len(self.ext.define_property_types()))
+
     def test_path_regex(self):
         prop = self.ext.define_property_types()[-1]
         self.assertEquals(None, prop.validators[-1].validate("/var/log/messages,/tmp/test.log,/var/another/*"))
@@ -58,6 +87,63 @@ class TestsysparamspluginExtension(unittest.TestCase):
 
         self.assertEquals(None, prop.validators[-1].validate("/home/my\ documents/,/tmp/test.log,/var/another/*"))
         
+    def test_path_character_set_enforced(self):
+        validator = PathListValidator()
+        self.assertEquals(None, validator.validate("/var/log/[ab]?.log"))
+        self.assertEquals('Value "/var/log/$app.log" is not a valid path.',
+            validator.validate("/var/log/messages,/var/log/$app.log").error_message)
+        self.assertEquals('Value "" is not a valid path.',
+            validator.validate("/var/log/messages,").error_message)
+        self.assertEquals('Value "/var/log/a\tb" is not a valid path.',
+            validator.validate("/var/log/a\tb").error_message)
+
+    def test_path_validate_many(self):
+        validator = PathListValidator()
+        values = ["/var/log/messages", "/var/log/a b", "/tmp/x.log,/tmp/y"]
+        results = validator.validate_many(values)
+        self.assertEquals(3, len(results))
+        self.assertEquals(None, results[0])
+        self.assertEquals('Value "/var/log/a b" is not a valid path.',
+                          results[1].error_message)
+        self.assertEquals(None, results[2])
+        self.assertEquals([], validator.validate_many([]))
+
+    def test_validate_property_value(self):
+        self.assertEquals(None,
+                          validate_property_value("logrotate_basic_size", "10M"))
+        self.assertEquals("Invalid value '10T'.",
+            validate_property_value("logrotate_basic_size", "10T").error_message)
+        self.assertEquals(None,
+                          validate_property_value("logrotate_time_period",
+                                                  "hour"))
+        self.assertEquals('Value "/var/log/a b" is not a valid path.',
+            validate_property_value("comma_separated_file_names",
+                                    "/var/log/a b").error_message)
+
+    def test_validation_results_are_cached(self):
+        paths = "comma_separated_file_names"
+        validate_property_value(paths, "/var/log/messages")
+        first = validate_property_value(paths, "/var/log/a b")
+        second = validate_property_value(paths, "/var/log/a b")
+        self.assertEquals(first.error_message, second.error_message)
+        self.assertFalse(first is second)
+        self.assertEquals(None,
+                          validate_property_value(paths, "/var/log/messages"))
+        stats = validation_cache.stats()
+        self.assertEquals(2, stats["hits"])
+        self.assertEquals(2, stats["misses"])
+        # Path results are only cached once, under their property type.
+        self.assertEquals(2, stats["size"])
+
+        validate_property_value("logrotate_email", "ops@example.com")
+        validate_property_value("logrotate_email", "ops@example.com")
+        self.assertEquals(3, validation_cache.stats()["hits"])
+
+    def test_item_validators_are_not_cached(self):
+        MailFirstAndMailLastValidator().validate({"mailfirst": "true"})
+        RotationSizeValidator().validate({"minsize": "1M", "size": "1k"})
+        self.assertEquals(0, validation_cache.stats()["size"])
+
     def test_mailfirst_and_maillast(self):
         validator = MailFirstAndMailLastValidator()
         expected = ValidationError(error_message='The properties "mailfirst"'
@@ -65,6 +151,131 @@ class TestsysparamspluginExtension(unittest.TestCase):
         result = validator.validate({'mailfirst': 'true', 'maillast': 'true'})
         self.assertEqual(expected, result)
 
+    def test_compression_profile(self):
+        validator = CompressionProfileValidator()
+        self.assertEquals(None, validator.validate({}))
+        self.assertEquals(None, validator.validate({
+            "compression_profile": "zstd", "compression_level": "19",
+            "compression_threads": "8", "compressext": ".zst"}))
+
+        error = validator.validate({"compression_profile": "gzip",
+                                    "compression_threads": "4"})
+        self.assertEquals("compression_threads", error.property_name)
+        self.assertEquals('The compression profile "gzip" is '
+                          'single-threaded; use "pigz", "zstd" or "xz" for '
+                          'more threads', error.error_message)
+
+        error = validator.validate({"compression_profile": "xz",
+                                    "compression_level": "12"})
+        self.assertEquals('The compression level of profile "xz" must be '
+                          'between 0 and 9', error.error_message)
+
+        error = validator.validate({"compression_profile": "pigz",
+                                    "compressext": ".zst"})
+        self.assertEquals('The property "compressext" conflicts with '
+                          'compression profile "pigz", which sets it to '
+                          '".gz"', error.error_message)
+
+        error = validator.validate({"compression_level": "3"})
+        self.assertEquals('The property "compression_level" requires the '
+                          'property "compression_profile"',
+                          error.error_message)
+
+    def test_unknown_compression_profile(self):
+        # Left to the logrotate_compression_profile property type.
+        self.assertEquals(None, CompressionProfileValidator().validate(
+            {"compression_profile": "bzip2", "compression_level": "30"}))
+
+    def test_compression_commands_cross_checked(self):
+        validator = CompressionProfileValidator()
+        self.assertEquals(None, validator.validate({
+            "compresscmd": "/usr/bin/bzip2", "compressext": ".bz2",
+            "uncompresscmd": "/usr/bin/bunzip2"}))
+        self.assertEquals(None, validator.validate({
+            "compresscmd": "/opt/custom/squash", "compressext": ".sq"}))
+        self.assertEquals('The property "compressext" must be ".xz" for '
+                          'compresscmd "/usr/bin/xz"',
+                          validator.validate({
+                              "compresscmd": "/usr/bin/xz",
+                              "compressext": ".gz"}).error_message)
+        self.assertEquals('The property "uncompresscmd" "/bin/gunzip" cannot '
+                          'uncompress the output of compresscmd '
+                          '"/usr/bin/zstd"',
+                          validator.validate({
+                              "compresscmd": "/usr/bin/zstd",
+                              "uncompresscmd": "/bin/gunzip"}).error_message)
+
+    def test_rotation_sizes_ordered(self):
+        validator = RotationSizeValidator()
+        self.assertEquals(None, validator.validate({}))
+        self.assertEquals(None, validator.validate({
+            "minsize": "1M", "size": "1024k", "maxsize": "1G"}))
+        self.assertEquals(None, validator.validate({"minsize": "10T",
+                                                    "maxsize": "1k"}))
+
+        error = validator.validate({"minsize": "2M", "maxsize": "1024k"})
+        self.assertEquals("maxsize", error.property_name)
+        self.assertEquals('The property "maxsize" (1024k) must not be '
+                          'smaller than the property "minsize" (2M)',
+                          error.error_message)
+        error = validator.validate({"size": "2G", "maxsize": "100M"})
+        self.assertEquals('The property "maxsize" (100M) must not be '
+                          'smaller than the property "size" (2G)',
+                          error.error_message)
+        self.assertEquals("size", validator.validate(
+            {"minsize": "512", "size": "511"}).property_name)
+
+    def test_rule_uniqueness(self):
+        validator = RuleUniquenessValidator()
+        rules = [
+            ('/n1/rules/a', {'name': 'app', 'path': '/var/log/a.log'}),
+            ('/n1/rules/b', {'name': 'app', 'path': '/var/log/b.log'}),
+            ('/n1/rules/c', {'name': 'other',
+                             'path': '/var/log/c.log,/var/log/a.log'}),
+            ('/n1/rules/d', {'name': 'last', 'path': '/var/log/d.log'}),
+        ]
+        errors = validator.validate(rules)
+        self.assertEquals(
+            [('/n1/rules/a', 'name', 'The name "app" is used by more than '
+              'one logrotate-rule: /n1/rules/a, /n1/rules/b'),
+             ('/n1/rules/a', 'path', 'The path "/var/log/a.log" is used by '
+              'more than one logrotate-rule: /n1/rules/a, /n1/rules/c'),
+             ('/n1/rules/b', 'name', 'The name "app" is used by more than '
+              'one logrotate-rule: /n1/rules/a, /n1/rules/b'),
+             ('/n1/rules/c', 'path', 'The path "/var/log/a.log" is used by '
+              'more than one logrotate-rule: /n1/rules/a, /n1/rules/c')],
+            [(e.item_path, e.property_name, e.error_message)
+             for e in errors])
+        self.assertEquals([], validator.validate(rules[2:]))
+
+    def test_rule_uniqueness_scales_linearly(self):
+        validator = RuleUniquenessValidator()
+
+        def rules(count):
+            # Every tenth rule reuses the name and path of its predecessor.
+            return [('/n1/rules/r%d' % i,
+                     {'name': 'rule%d' % (i - i % 10 // 9),
+                      'path': '/var/log/r%d/*.log,/var/log/r%d.log' %
+                              (i, i - i % 10 // 9)})
+                    for i in range(count)]
+
+        def elapsed(count):
+            model = rules(count)
+            best = None
+            for _ in range(3):
+                start = time.time()
+                errors = validator.validate(model)
+                taken = time.time() - start
+                best = taken if best is None else min(best, taken)
+            self.assertEquals(count // 10 * 4, len(errors))
+            return best
+
+        small = elapsed(1000)
+        large = elapsed(10000)
+        # A pairwise comparison would be ~100 times slower at 10x the rules.
+        self.assertTrue(large < max(small, 0.001) * 30,
+                        "1k rules: %.4fs, 10k rules: %.4fs" % (small, large))
+
 
 if __name__ == '__main__':
     unittest.main()
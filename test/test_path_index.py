@@ -0,0 +1,120 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import time
+import unittest
+from logrotate_extension.path_index import PathIndex
+from logrotate_extension.path_index import PathOverlap
+from logrotate_extension.path_index import find_overlaps
+from logrotate_extension.path_index import segments_intersect
+
+
+class TestPathIndex(unittest.TestCase):
+
+    def test_segments_intersect(self):
+        self.assertTrue(segments_intersect("error.log", "*.log"))
+        self.assertTrue(segments_intersect("*.log", "error*"))
+        self.assertTrue(segments_intersect("app-[0-9].log", "app-?.log"))
+        self.assertTrue(segments_intersect("app-[!a].log", "app-[ab].log"))
+        self.assertFalse(segments_intersect("*.log", "*.txt"))
+        self.assertFalse(segments_intersect("app-[0-9].log", "app-[a-z].log"))
+        self.assertFalse(segments_intersect("a.log", "b.log"))
+
+    def test_matching(self):
+        index = PathIndex()
+        index.add_rule("app", "/var/log/app/*.log,/var/log/other.log")
+        index.add_rule("web", "/var/log/*/access.log")
+        self.assertEquals([("app", "/var/log/app/*.log")],
+                          index.matching("/var/log/app/error.log"))
+        self.assertEquals(sorted([("app", "/var/log/app/*.log"),
+                                  ("web", "/var/log/*/access.log")]),
+                          sorted(index.matching("/var/log/app/access.log")))
+        self.assertEquals([], index.matching("/var/log/app/error.txt"))
+        self.assertEquals([], index.matching("/var/log/app"))
+
+    def test_find_overlaps(self):
+        overlaps = find_overlaps([
+            ("zapp", "/var/log/app/error.log"),
+            ("app", "/var/log/app/*.log"),
+            ("web", "/var/log/web/*.log,/var/log/app/*-web.*"),
+            ("same", "/var/log/same/*.log,/var/log/same/a.log"),
+        ])
+        self.assertEquals([
+            PathOverlap("app", "/var/log/app/*.log",
+                        "web", "/var/log/app/*-web.*", False, False),
+            PathOverlap("app", "/var/log/app/*.log",
+                        "zapp", "/var/log/app/error.log", True, False),
+        ], overlaps)
+
+    def test_first_rule_alphabetically_applies(self):
+        overlaps = find_overlaps([("a", "/var/log/x.log"),
+                                  ("b", "/var/log/*.log")])
+        self.assertEquals([PathOverlap("a", "/var/log/x.log",
+                                       "b", "/var/log/*.log", False, False)],
+                          overlaps)
+
+    def test_rules_in_other_directories_rotate_twice(self):
+        overlaps = find_overlaps([("a", "/var/log/*.log"),
+                                  ("b", "/var/log/x.log"),
+                                  ("c", "/var/log/x.log")],
+                                 {"b": "/etc/logrotate.litp"})
+        self.assertEquals([
+            PathOverlap("a", "/var/log/*.log", "b", "/var/log/x.log",
+                        False, True),
+            PathOverlap("a", "/var/log/*.log", "c", "/var/log/x.log",
+                        True, False),
+            PathOverlap("b", "/var/log/x.log", "c", "/var/log/x.log",
+                        False, True),
+        ], overlaps)
+
+    def test_scales_with_segments(self):
+        def rules(count):
+            return [("rule%05d" % i,
+                     "/var/log/app%d/*.log,/var/log/app%d/current" % (i, i))
+                    for i in range(count)]
+
+        def elapsed(count):
+            model = rules(count)
+            start = time.time()
+            self.assertEquals([], find_overlaps(model))
+            return time.time() - start
+
+        small = elapsed(1000)
+        large = elapsed(10000)
+        self.assertTrue(large < max(small, 0.001) * 30,
+                        "1k rules: %.4fs, 10k rules: %.4fs" % (small, large))
+
+    def test_scales_with_glob_directories(self):
+        def rules(count):
+            return [("rule%05d" % i, "/var/log/app%d-*/out.log" % i)
+                    for i in range(count)]
+
+        def elapsed(count):
+            model = rules(count)
+            start = time.time()
+            self.assertEquals([], find_overlaps(model))
+            return time.time() - start
+
+        small = elapsed(1000)
+        large = elapsed(10000)
+        self.assertTrue(large < max(small, 0.001) * 30,
+                        "1k rules: %.4fs, 10k rules: %.4fs" % (small, large))
+        # Overlapping glob directories are still found.
+        self.assertEquals(
+            [("a", "/var/log/svc1*/out.log", "b", "/var/log/svc12*/out.log")],
+            [overlap[:4] for overlap in find_overlaps([
+                ("a", "/var/log/svc1*/out.log"),
+                ("b", "/var/log/svc12*/out.log"),
+                ("c", "/var/log/web*/out.log")])])
+
+
+if __name__ == '__main__':
+    unittest.main()
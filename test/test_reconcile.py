@@ -0,0 +1,140 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from logrotate_extension.reconcile import LogrotateDirIndex
+from logrotate_extension.reconcile import Stanza
+from logrotate_extension.reconcile import directory_index
+from logrotate_extension.reconcile import parse_stanzas
+from logrotate_extension.renderer import RULE_FILE_HEADER
+
+SYSLOG = """\
+# syslog rotation
+weekly
+/var/log/messages /var/log/secure
+/var/log/maillog
+{
+    missingok
+    sharedscripts
+    postrotate
+        /bin/kill -HUP `cat /var/run/syslogd.pid 2> /dev/null` || true
+        case $x in *) { echo "}" ; } ;; esac
+    endscript
+}
+
+"/var/log/my app/*.log" {
+    rotate 5
+}
+/var/log/cron { daily }
+"""
+
+
+class TestParseStanzas(unittest.TestCase):
+
+    def test_parse_stanzas(self):
+        self.assertEquals([
+            Stanza(("/var/log/messages", "/var/log/secure",
+                    "/var/log/maillog"), 3),
+            Stanza(("/var/log/my\\ app/*.log",), 14),
+            Stanza(("/var/log/cron",), 17),
+        ], list(parse_stanzas(SYSLOG.splitlines(True))))
+
+
+class TestLogrotateDirIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self._write("syslog", SYSLOG)
+        self._write("httpd", "/var/log/httpd/*log {\n    missingok\n}\n")
+        self._write("httpd.rpmsave", "/var/log/app.log {\n}\n")
+        self._write("litp_app", RULE_FILE_HEADER +
+                    "/var/log/litp/*.log {\n    rotate 5\n}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, content, mtime=None):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def test_index(self):
+        index = LogrotateDirIndex(self.directory)
+        self.assertEquals(["httpd", "litp_app", "syslog"], index.refresh())
+        self.assertEquals(None, index.config_file("httpd.rpmsave"))
+        self.assertTrue(index.unmanaged("syslog"))
+        self.assertFalse(index.unmanaged("litp_app"))
+        self.assertEquals((), index.config_file("litp_app").stanzas)
+        self.assertEquals([("httpd", "/var/log/httpd/*log")],
+                          index.matching("/var/log/httpd/access_log"))
+        self.assertEquals([], index.matching("/var/log/litp/a.log"))
+
+    def test_only_changed_files_are_parsed_again(self):
+        index = LogrotateDirIndex(self.directory)
+        index.refresh()
+        self.assertEquals([], index.refresh())
+        self.assertEquals(3, index.parses)
+
+        self._write("httpd", "/var/log/httpd/*.log {\n}\n", mtime=1)
+        self.assertEquals(["httpd"], index.refresh())
+        self.assertEquals([], index.matching("/var/log/httpd/access_log"))
+
+        os.remove(os.path.join(self.directory, "syslog"))
+        self.assertEquals([], index.refresh())
+        self.assertEquals([], index.matching("/var/log/messages"))
+        self.assertEquals(4, index.parses)
+
+    def test_validate(self):
+        index = LogrotateDirIndex(self.directory)
+        index.refresh()
+        errors = index.validate([
+            ("/n1/rules/a", {"name": "httpd", "path": "/var/log/a.log"}),
+            ("/n1/rules/b", {"name": "zzz", "path": "/var/log/messages"}),
+            ("/n1/rules/c", {"name": "apache",
+                             "path": "/var/log/httpd/*_log"}),
+            ("/n1/rules/d", {"name": "litp_app",
+                             "path": "/var/log/litp/*.log"}),
+            ("/n1/rules/e", {"name": "aaa", "path": "/var/log/secure",
+                             "stagger_window": "30"}),
+        ])
+        self.assertEquals([
+            ("/n1/rules/a", "name",
+             'The name "httpd" is used by the file %s/httpd, which is not '
+             'managed by LITP' % self.directory),
+            ("/n1/rules/b", "path",
+             'The path "/var/log/messages" is shadowed by '
+             '"/var/log/messages" in %s/syslog, which is not managed by '
+             'LITP and is read first by logrotate' % self.directory),
+            ("/n1/rules/c", "path",
+             'The path "/var/log/httpd/*_log" overlaps '
+             '"/var/log/httpd/*log" in %s/httpd, which is not managed by '
+             'LITP; logrotate applies the file "apache", which it reads '
+             'first' % self.directory),
+            ("/n1/rules/e", "path",
+             'The path "/var/log/secure" overlaps "/var/log/secure" in '
+             '%s/syslog, which is not managed by LITP; the rule is rotated '
+             'by a logrotate run of its own, so the files matched by both '
+             'are rotated twice' % self.directory),
+        ], [(e.item_path, e.property_name, e.error_message) for e in errors])
+
+    def test_directory_index_is_shared(self):
+        index = directory_index(self.directory)
+        self.assertTrue(index is directory_index(self.directory))
+        self.assertEquals(3, index.parses)
+
+
+if __name__ == '__main__':
+    unittest.main()
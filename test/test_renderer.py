@@ -0,0 +1,171 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from logrotate_extension.renderer import RULE_FILE_HEADER
+from logrotate_extension.renderer import RuleRenderer
+from logrotate_extension.renderer import render_rule
+from logrotate_extension.renderer import rule_directory
+
+
+class TestRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_render_rule(self):
+        properties = {
+            "name": "app",
+            "path": "/var/log/app/*.log,/var/log/my\\ app.log",
+            "compress": "true",
+            "create": "true",
+            "create_mode": "0640",
+            "create_owner": "root",
+            "create_group": "adm",
+            "ifempty": "false",
+            "mail": "ops@example.com",
+            "maillast": "true",
+            "mailfirst": "false",
+            "rotate": "7",
+            "rotate_every": "week",
+            "postrotate": "/sbin/service app reload\n/bin/true",
+        }
+        self.assertEquals(
+            '/var/log/app/*.log "/var/log/my app.log" {\n'
+            '    compress\n'
+            '    create 0640 root adm\n'
+            '    notifempty\n'
+            '    mail ops@example.com\n'
+            '    maillast\n'
+            '    rotate 7\n'
+            '    weekly\n'
+            '    postrotate\n'
+            '        /sbin/service app reload\n'
+            '        /bin/true\n'
+            '    endscript\n'
+            '}\n',
+            "".join(render_rule(properties)))
+
+    def test_compression_profile(self):
+        self.assertEquals(
+            "/var/log/a.log {\n"
+            "    compress\n"
+            "    compresscmd /usr/bin/zstd\n"
+            "    compressext .zst\n"
+            "    compressoptions -9 -T4\n"
+            "    uncompresscmd /usr/bin/unzstd\n"
+            "}\n",
+            "".join(render_rule({"path": "/var/log/a.log",
+                                 "compress": "true",
+                                 "compression_profile": "zstd",
+                                 "compression_level": "9",
+                                 "compression_threads": "4"})))
+
+    def test_unknown_compression_profile(self):
+        self.assertEquals(
+            "/var/log/a.log {\n}\n",
+            "".join(render_rule({"path": "/var/log/a.log",
+                                 "compression_profile": "lz4"})))
+
+    def test_hourly_and_maxsize(self):
+        self.assertEquals(
+            "/var/log/a.log {\n    maxsize 1G\n    hourly\n}\n",
+            "".join(render_rule({"path": "/var/log/a.log",
+                                 "maxsize": "1G",
+                                 "rotate_every": "hour"})))
+
+    def test_create_false(self):
+        self.assertEquals(
+            "/var/log/a.log {\n    nocreate\n}\n",
+            "".join(render_rule({"path": "/var/log/a.log",
+                                 "create": "false",
+                                 "create_mode": "0640"})))
+
+    def test_unchanged_rules_are_not_rewritten(self):
+        renderer = RuleRenderer()
+        rules = [("a", {"path": "/var/log/a.log", "rotate": "5"}),
+                 ("b", {"path": "/var/log/b.log", "rotate": "5"})]
+        self.assertEquals(["a", "b"], renderer.write(self.tmpdir, rules))
+        with open(os.path.join(self.tmpdir, "a")) as f:
+            self.assertEquals(RULE_FILE_HEADER +
+                              "/var/log/a.log {\n    rotate 5\n}\n", f.read())
+
+        self.assertEquals([], renderer.write(self.tmpdir, rules))
+        rules[1][1]["rotate"] = "6"
+        self.assertEquals(["b"], renderer.write(self.tmpdir, rules))
+
+        # A new renderer recognises the files already on disk.
+        self.assertEquals([], RuleRenderer().write(self.tmpdir, rules))
+
+    def test_staggered_rules_are_written_apart(self):
+        self.assertEquals("/etc/logrotate.d", rule_directory({}))
+        self.assertEquals("/etc/logrotate.d",
+                          rule_directory({"stagger_window": "0"}))
+        self.assertEquals("/etc/logrotate.litp",
+                          rule_directory({"stagger_window": "30"}))
+        self.assertEquals("/etc/logrotate.litp",
+                          rule_directory({"rotate_every": "hour"}))
+
+        daily = os.path.join(self.tmpdir, "logrotate.d")
+        staggered = os.path.join(self.tmpdir, "logrotate.litp")
+        os.mkdir(daily)
+        with open(os.path.join(daily, "b"), "w") as f:
+            f.write("/var/log/b.log {\n}\n")
+        renderer = RuleRenderer()
+        rules = [("a", {"path": "/var/log/a.log", "stagger_window": "30"}),
+                 ("b", {"path": "/var/log/b.log"})]
+        self.assertEquals([os.path.join(daily, "b"),
+                           os.path.join(staggered, "a")],
+                          renderer.write_rules(rules, daily, staggered))
+        self.assertEquals(["b"], os.listdir(daily))
+        self.assertEquals(["a"], os.listdir(staggered))
+
+        # A rule no longer staggered moves back to the daily directory.
+        rules[0][1]["stagger_window"] = "0"
+        self.assertEquals([os.path.join(daily, "a")],
+                          renderer.write_rules(rules, daily, staggered))
+        self.assertEquals(["a", "b"], sorted(os.listdir(daily)))
+        self.assertEquals([], os.listdir(staggered))
+
+    def test_failed_write_leaves_no_file(self):
+        renderer = RuleRenderer()
+        rules = [("a", {"path": "/var/log/a.log"})]
+        # The rename fails on the directory in the way of the rule file.
+        os.mkdir(os.path.join(self.tmpdir, "a"))
+        with open(os.path.join(self.tmpdir, "a", "x"), "w"):
+            pass
+        self.assertRaises(OSError, renderer.write, self.tmpdir, rules)
+        self.assertEquals(["a"], os.listdir(self.tmpdir))
+        self.assertEquals(None, renderer.digest("a"))
+
+        shutil.rmtree(os.path.join(self.tmpdir, "a"))
+        self.assertEquals(["a"], renderer.write(self.tmpdir, rules))
+
+    def test_changed(self):
+        renderer = RuleRenderer()
+        rules = [("a", {"path": "/var/log/a.log"})]
+        self.assertEquals(["a"], [name for name, _ in
+                                  renderer.changed(rules)])
+        self.assertEquals([], list(renderer.changed(rules)))
+        renderer.forget("a")
+        self.assertEquals(None, renderer.digest("a"))
+        self.assertEquals(["a"], [name for name, _ in
+                                  renderer.changed(rules)])
+
+
+if __name__ == '__main__':
+    unittest.main()
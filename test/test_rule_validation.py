@@ -0,0 +1,115 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import unittest
+from logrotate_extension.rule_validation import IncrementalValidator
+from logrotate_extension.rule_validation import fingerprint
+from logrotate_extension.rule_validation import validate_rule
+from logrotate_extension.rule_validation import validate_rules
+
+
+def _rules(count):
+    rules = []
+    for i in range(count):
+        properties = {"name": "rule%d" % i,
+                      "path": "/var/log/app%d/*.log" % i,
+                      "rotate_every": "day"}
+        if i % 7 == 0:
+            properties["path"] = "/var/log/app %d.log" % i
+        if i % 11 == 0:
+            properties["size"] = "10T"
+        if i % 13 == 0:
+            properties["mailfirst"] = properties["maillast"] = "true"
+        rules.append(("/nodes/n%d/rules/r%d" % (i // 100, i), properties))
+    return rules
+
+
+def _summary(errors):
+    return [(e.item_path, e.property_name, e.error_message) for e in errors]
+
+
+class TestRuleValidation(unittest.TestCase):
+
+    def test_validate_rule(self):
+        errors = validate_rule("/n1/rules/r1", {
+            "path": "/var/log/a b", "size": "10M", "rotate_every": "hourly",
+            "mailfirst": "true", "maillast": "true"})
+        self.assertEquals([
+            ("/n1/rules/r1", "path",
+             'Value "/var/log/a b" is not a valid path.'),
+            ("/n1/rules/r1", "rotate_every", "Invalid value 'hourly'."),
+            ("/n1/rules/r1", None, 'The properties "mailfirst" and '
+             '"maillast" can not both be set to true'),
+        ], _summary(errors))
+        self.assertEquals([], validate_rule("/n1/rules/r2",
+                                            {"path": "/var/log/a.log"}))
+        self.assertEquals([("/n1/rules/r3", "compression_profile",
+                            "Invalid value 'lz4'.")],
+                          _summary(validate_rule("/n1/rules/r3", {
+                              "name": "r3", "path": "/var/log/a.log",
+                              "compression_profile": "lz4"})))
+
+    def test_parallel_matches_serial(self):
+        rules = _rules(500)
+        serial = _summary(validate_rules(rules, processes=1))
+        parallel = _summary(validate_rules(rules, processes=3,
+                                           min_rules_per_process=50))
+        self.assertEquals(serial, parallel)
+        # One error per invalid path, size and mailfirst/maillast pair.
+        self.assertEquals(72 + 46 + 39, len(serial))
+
+    def test_small_models_are_validated_serially(self):
+        self.assertEquals([], validate_rules([], processes=8))
+        self.assertEquals(1, len(validate_rules(_rules(10)[7:8],
+                                                processes=8)))
+
+    def test_fingerprint(self):
+        self.assertEquals(fingerprint({"a": "1", "b": "2"}),
+                          fingerprint({"b": "2", "a": "1"}))
+        self.assertNotEquals(fingerprint({"a": "1"}),
+                             fingerprint({"a": "1", "b": "2"}))
+        self.assertNotEquals(fingerprint({"a": "1"}), fingerprint({"a": "2"}))
+
+    def test_incremental_validation(self):
+        nodes = [("/n%d" % n, [("/n%d/rules/r%d" % (n, r),
+                                {"name": "r%d" % r,
+                                 "path": "/var/log/r%d.log" % r})
+                               for r in range(3)])
+                 for n in range(2)]
+        validator = IncrementalValidator()
+        self.assertEquals([], validator.validate(nodes))
+        self.assertEquals(6, len(validator.revalidated))
+
+        self.assertEquals([], validator.validate(nodes))
+        self.assertEquals([], validator.revalidated)
+
+        nodes[1][1][2][1]["size"] = "10T"
+        nodes[1][1][1][1]["name"] = "r0"
+        self.assertEquals(
+            [("/n1/rules/r2", "size", "Invalid value '10T'."),
+             ("/n1/rules/r0", "name", 'The name "r0" is used by more than '
+              'one logrotate-rule: /n1/rules/r0, /n1/rules/r1'),
+             ("/n1/rules/r1", "name", 'The name "r0" is used by more than '
+              'one logrotate-rule: /n1/rules/r0, /n1/rules/r1')],
+            _summary(validator.validate(nodes)))
+        self.assertEquals(["/n1/rules/r1", "/n1/rules/r2"],
+                          validator.revalidated)
+
+        # Invalid items and nodes are checked again on the next run.
+        self.assertEquals(3, len(validator.validate(nodes)))
+        self.assertEquals(["/n1/rules/r2"], validator.revalidated)
+
+        self.assertEquals(3, len(validator.validate(nodes, full=True)))
+        self.assertEquals(6, len(validator.revalidated))
+
+
+if __name__ == '__main__':
+    unittest.main()
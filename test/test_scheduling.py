@@ -0,0 +1,88 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import unittest
+from logrotate_extension.scheduling import cron_entry
+from logrotate_extension.scheduling import rotation_schedule
+from logrotate_extension.scheduling import rule_cron_entry
+from logrotate_extension.scheduling import stagger_offset
+
+
+class TestScheduling(unittest.TestCase):
+
+    def test_offsets_are_stable_and_within_window(self):
+        offsets = [stagger_offset("node%d" % n, "rule%d" % r, 120)
+                   for n in range(20) for r in range(20)]
+        self.assertEquals(offsets,
+                          [stagger_offset("node%d" % n, "rule%d" % r, 120)
+                           for n in range(20) for r in range(20)])
+        self.assertTrue(all(0 <= offset < 120 for offset in offsets))
+        # 400 rules spread over most of the 120 minutes of the window.
+        self.assertTrue(len(set(offsets)) > 100)
+
+    def test_node_scope(self):
+        self.assertEquals(
+            set([stagger_offset("node1", "any", 60, "node")]),
+            set(stagger_offset("node1", "rule%d" % r, 60, "node")
+                for r in range(10)))
+
+    def test_no_window(self):
+        self.assertEquals(0, stagger_offset("node1", "rule1", 0))
+        self.assertEquals("0 3 * * *",
+                          rotation_schedule("node1", {"name": "rule1"}))
+
+    def test_rotation_schedule(self):
+        properties = {"name": "rule1", "stagger_window": "60",
+                      "rotate_every": "week"}
+        self.assertEquals(39, stagger_offset("node1", "rule1", 60))
+        self.assertEquals("39 3 * * 0",
+                          rotation_schedule("node1", properties))
+        self.assertEquals("9 0 * * 1",
+                          rotation_schedule("node1", properties, (23, 30)))
+        properties["rotate_every"] = "month"
+        self.assertEquals("9 0 2 * *",
+                          rotation_schedule("node1", properties, (23, 30)))
+        properties["rotate_every"] = "year"
+        self.assertEquals("39 3 1 1 *",
+                          rotation_schedule("node1", properties))
+        properties["rotate_every"] = "hour"
+        self.assertEquals("9 * * * *",
+                          rotation_schedule("node1", properties, (23, 30)))
+
+    def test_cron_entry(self):
+        self.assertEquals("0 3 * * * root /usr/sbin/logrotate "
+                          "-s /var/lib/logrotate/app.status "
+                          "/etc/logrotate.litp/app",
+                          cron_entry("0 3 * * *", "/etc/logrotate.litp/app",
+                                     "/var/lib/logrotate/app.status"))
+
+    def test_rule_cron_entry(self):
+        properties = {"name": "rule1", "stagger_window": "60",
+                      "rotate_every": "week"}
+        self.assertEquals("39 3 * * 0 root /usr/sbin/logrotate "
+                          "-s /var/lib/logrotate.litp-rule1.status "
+                          "/etc/logrotate.litp/rule1",
+                          rule_cron_entry("node1", properties))
+        properties["stagger_window"] = "0"
+        self.assertEquals(None, rule_cron_entry("node1", properties))
+
+    def test_unstaggered_hourly_rule_has_its_own_cron_entry(self):
+        # The daily logrotate run would only rotate it once a day.
+        self.assertEquals("0 * * * * root /usr/sbin/logrotate "
+                          "-s /var/lib/logrotate.litp-app.status "
+                          "/etc/logrotate.litp/app",
+                          rule_cron_entry("node1", {
+                              "name": "app", "path": "/var/log/app.log",
+                              "rotate_every": "hour"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+##############################################################################
+# COPYRIGHT Ericsson AB 2013
+#
+# The copyright to the computer program(s) herein is the property of
+# Ericsson AB. The programs may be used and/or copied only with written
+# permission from Ericsson AB. or in accordance with the terms and
+# conditions stipulated in the agreement/contract under which the
+# program(s) have been supplied.
+##############################################################################
+
+
+import unittest
+from logrotate_extension import simulator
+from logrotate_extension.simulator import simulate
+from logrotate_extension.simulator import simulate_nodes
+from logrotate_extension.units import size_to_bytes
+
+
+class TestSizeToBytes(unittest.TestCase):
+
+    def test_size_to_bytes(self):
+        self.assertEquals(512, size_to_bytes("512"))
+        self.assertEquals(100 * 1024, size_to_bytes("100k"))
+        self.assertEquals(10 * 1024 ** 2, size_to_bytes("10M"))
+        self.assertEquals(2 * 1024 ** 3, size_to_bytes("2G"))
+
+
+@unittest.skipIf(simulator.numpy is None, "NumPy is not installed")
+class TestSimulator(unittest.TestCase):
+
+    def test_rotate_count_caps_disk_use(self):
+        result = simulate([({"rotate_every": "day", "rotate": "2"}, 100.0)],
+                          days=5)
+        self.assertEquals([100, 200, 200, 200, 200],
+                          list(result.disk_usage))
+        self.assertEquals([0] * 5, list(result.rotation_io))
+        self.assertEquals((200, 1), (result.peak_disk, result.peak_disk_day))
+
+    def test_compress_and_delaycompress(self):
+        rule = {"rotate_every": "day", "rotate": "2", "compress": "true"}
+        result = simulate([(rule, 100.0)], days=3, compression_ratio=0.5)
+        self.assertEquals([50, 100, 100], list(result.disk_usage))
+        self.assertEquals([150, 150, 150], list(result.rotation_io))
+
+        rule["delaycompress"] = "true"
+        result = simulate([(rule, 100.0)], days=3, compression_ratio=0.5)
+        self.assertEquals([100, 150, 150], list(result.disk_usage))
+        self.assertEquals([0, 150, 150], list(result.rotation_io))
+
+    def test_size_minsize_and_copytruncate(self):
+        result = simulate([
+            ({"rotate_every": "week", "rotate": "3", "size": "250"}, 100.0),
+            ({"rotate_every": "day", "rotate": "3", "minsize": "25",
+              "copytruncate": "true"}, [10, 20, 30, 40, 50]),
+        ], days=5)
+        # The first file rotates on day 3, once it reaches 250 bytes; the
+        # second on day 2, and is copied (read and written) each time.
+        self.assertEquals([110, 230, 360, 500, 620],
+                          list(result.disk_usage))
+        self.assertEquals([0, 60, 60, 80, 100], list(result.rotation_io))
+        self.assertEquals((100, 4), (result.peak_io, result.peak_io_day))
+
+    def test_maxsize(self):
+        rule = {"rotate_every": "week", "rotate": "3", "maxsize": "250",
+                "compress": "true"}
+        result = simulate([(rule, 100.0)], days=5, compression_ratio=0.5)
+        self.assertEquals([100, 200, 150, 250, 350],
+                          list(result.disk_usage))
+        self.assertEquals([0, 0, 450, 0, 0], list(result.rotation_io))
+
+    def test_size_supersedes_the_period(self):
+        rule = {"rotate_every": "day", "rotate": "4", "size": "250",
+                "compress": "true"}
+        result = simulate([(rule, 100.0)], days=5, compression_ratio=0.5)
+        # Not rotated daily, only on day 3 once it reaches 250 bytes.
+        self.assertEquals([100, 200, 150, 250, 350],
+                          list(result.disk_usage))
+        self.assertEquals([0, 0, 450, 0, 0], list(result.rotation_io))
+
+    def test_hourly_rotation(self):
+        # Hourly rules are simulated hour by hour; daily ones still rotate
+        # once a day.
+        result = simulate([
+            ({"rotate_every": "hour", "rotate": "2", "compress": "true"},
+             240.0),
+            ({"rotate_every": "day", "rotate": "1"}, 240.0),
+        ], days=2, compression_ratio=0.5)
+        self.assertEquals([250, 250], list(result.disk_usage))
+        self.assertEquals([360, 360], list(result.rotation_io))
+
+    def test_maxage(self):
+        result = simulate([({"rotate_every": "day", "rotate": "5",
+                             "maxage": "1"}, 10.0)], days=4)
+        self.assertEquals([10, 20, 20, 20], list(result.disk_usage))
+
+    def test_recorded_growth_and_defaults(self):
+        # Without a rule period, rotation is weekly with 4 files kept, so
+        # the peak is 4 rotated weeks plus 6 days of the current file.
+        growth = [1.0] * 70
+        result = simulate([({}, growth)], days=70)
+        self.assertEquals((34, 33), (result.peak_disk, result.peak_disk_day))
+
+    def test_simulate_nodes(self):
+        nodes = [("n1", [({"rotate_every": "day", "rotate": "2"}, 10.0)]),
+                 ("n2", [({"rotate_every": "day", "rotate": "9"}, 10.0)])]
+        self.assertEquals(["n1", "n2"],
+                          [n for n, _ in simulate_nodes(nodes, days=10)])
+        self.assertEquals(["n2"], [n for n, _ in
+                                   simulate_nodes(nodes, 10, capacity=50)])
+
+
+if __name__ == '__main__':
+    unittest.main()